@@ -0,0 +1,8 @@
+"""Entry-point module, in case you use `python -m mkdocstrings_handlers.python`."""
+
+import sys
+
+from mkdocstrings_handlers.python.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,354 @@
+"""This module implements the persistent caches of the handler.
+
+Cache directories can be shared by several builds running at the same time:
+entries are written atomically, checked against a digest when they are read,
+and updated under an inter-process lock when several builds may merge their data into them.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import zipfile
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath, PureWindowsPath
+from typing import Optional, Union
+
+from mkdocstrings import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class CacheStats:
+    """Dataclass counting the operations of a cache."""
+
+    hits: int = 0
+    """The number of entries found in the cache."""
+    misses: int = 0
+    """The number of entries not found in the cache."""
+    evictions: int = 0
+    """The number of entries evicted from the cache."""
+    bytes: int = 0
+    """The number of bytes stored in the cache."""
+
+
+def content_hash(*parts: Union[bytes, str]) -> str:
+    """Hash contents to build a cache key.
+
+    Arguments:
+        *parts: The contents to hash. Strings are encoded as UTF-8.
+
+    Returns:
+        The hexadecimal digest of the contents.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf8") if isinstance(part, str) else part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+ENTRY_MAGIC = b"mkdpl1"
+"""The bytes starting every cache entry, followed by the SHA-256 digest of its data."""
+
+_HEADER_SIZE = len(ENTRY_MAGIC) + hashlib.sha256().digest_size
+
+
+def read_cache(path: Path) -> Optional[bytes]:
+    """Read a cache entry.
+
+    Entries are checked against the digest written in their header.
+    Corrupted entries, or entries written by another version, are discarded.
+    The modification time of valid entries is updated, so that the least recently used entries
+    can be evicted first, see [`prune_cache`][mkdocstrings_handlers.python.cache.prune_cache].
+
+    Arguments:
+        path: The path of the cache entry.
+
+    Returns:
+        The cached data, or `None` if the entry does not exist, cannot be read, or is corrupted.
+    """
+    try:
+        entry = path.read_bytes()
+    except OSError:
+        return None
+    header, data = entry[:_HEADER_SIZE], entry[_HEADER_SIZE:]
+    if header != ENTRY_MAGIC + hashlib.sha256(data).digest():
+        logger.debug(f"Discarding corrupted cache entry {path}")
+        with suppress(OSError):
+            path.unlink(missing_ok=True)
+        return None
+    with suppress(OSError):
+        os.utime(path)
+    return data
+
+
+def write_cache(path: Path, data: bytes) -> None:
+    """Write a cache entry.
+
+    The data is first written to a temporary file, then moved in place,
+    so that readers (in this process or in others) never see a partially written entry.
+
+    Arguments:
+        path: The path of the cache entry.
+        data: The data to cache.
+    """
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(prefix=f"{path.name}.", suffix=".tmp", dir=path.parent)
+    except OSError as error:
+        logger.debug(f"Could not write cache entry {path}: {error}")
+        return
+    try:
+        with os.fdopen(fd, "wb") as temp_file:
+            temp_file.write(ENTRY_MAGIC + hashlib.sha256(data).digest())
+            temp_file.write(data)
+        os.replace(temp_name, path)
+    except OSError as error:
+        logger.debug(f"Could not write cache entry {path}: {error}")
+        Path(temp_name).unlink(missing_ok=True)
+
+
+@contextmanager
+def locked(path: Path) -> Iterator[None]:
+    """Hold an exclusive lock on a cache entry, shared with other processes.
+
+    The lock is taken on a separate `.lock` file, so that the entry itself can still be replaced atomically.
+    It should be held when reading, updating and writing back an entry,
+    so that concurrent updates are not lost. If the lock cannot be taken, the entry is used without it.
+
+    Arguments:
+        path: The path of the cache entry.
+
+    Yields:
+        Nothing, while the lock is held.
+    """
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(path.with_name(f"{path.name}.lock"), "a+b")  # noqa: SIM115
+    except OSError as error:
+        logger.debug(f"Could not lock cache entry {path}: {error}")
+        yield
+        return
+    with lock_file:
+        _lock(lock_file.fileno())
+        try:
+            yield
+        finally:
+            _unlock(lock_file.fileno())
+
+
+def prune_cache(directory: Path, max_size: int, stats: Optional[CacheStats] = None) -> int:
+    """Evict the least recently used entries of a cache directory, until it fits in the given size.
+
+    Arguments:
+        directory: The cache directory.
+        max_size: The maximum total size of the entries, in bytes.
+        stats: The statistics to update.
+
+    Returns:
+        The number of evicted entries.
+    """
+    with locked(directory / "prune"):
+        entries = []
+        for path in directory.rglob("*"):
+            # Stores are compacted within their own budget.
+            if path.suffix not in (".tmp", ".lock", ".store"):
+                with suppress(OSError):
+                    if path.is_file():
+                        stat = path.stat()
+                        entries.append((stat.st_mtime, stat.st_size, path))
+        size = sum(entry_size for _, entry_size, _ in entries)
+        evicted = 0
+        for _, entry_size, path in sorted(entries):
+            if size <= max_size:
+                break
+            with suppress(OSError):
+                path.unlink()
+                size -= entry_size
+                evicted += 1
+    if stats:
+        stats.evictions += evicted
+    if evicted:
+        logger.debug(f"Evicted {evicted} entries from {directory}")
+    return evicted
+
+
+if sys.platform == "win32":
+    import msvcrt
+
+    def _lock(fd: int) -> None:
+        os.lseek(fd, 0, os.SEEK_SET)
+        # `LK_LOCK` gives up after 10 seconds, retry until the lock is acquired.
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            except OSError:
+                continue
+            return
+
+    def _unlock(fd: int) -> None:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _lock(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+    def _unlock(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+BUNDLE_VERSION = 2
+"""The version of the format of cache bundles."""
+
+BUNDLE_EXCLUDE = ("templates",)
+"""The cache subdirectories that are not bundled, because they depend on the installation paths of templates."""
+
+BUNDLE_EXCLUDE_SUFFIXES = (".tmp", ".lock", ".store")
+"""The suffixes of the cache files that are not bundled. Stores are bundled entry by entry."""
+
+
+def _portable_path(path: str, roots: Sequence[str]) -> str:
+    # Longest roots first, so that nested roots win.
+    for index, root in sorted(enumerate(roots), key=lambda item: len(item[1]), reverse=True):
+        try:
+            relative = os.path.commonpath((path, root)) == root
+        except ValueError:  # Different drives.
+            relative = False
+        if relative:
+            return f"<{index}>/{Path(os.path.relpath(path, root)).as_posix()}"
+    return path
+
+
+def _local_path(path: str, roots: Sequence[str]) -> str:
+    if path.startswith("<") and (end := path.find(">/")) > 0:
+        index = int(path[1:end])
+        if index < len(roots):
+            return os.path.join(roots[index], *path[end + 2 :].split("/"))
+    return path
+
+
+def _relocate_entry(data: bytes, relocate: Callable[[str], str]) -> bytes:
+    # Rewrite the file paths of a collection cache entry.
+    entry = json.loads(data)
+    entry["files"] = {relocate(path): digest for path, digest in entry["files"].items()}
+    stack = list(entry["response"]["objects"])
+    while stack:
+        obj = stack.pop()
+        if obj.get("file_path"):
+            obj["file_path"] = relocate(obj["file_path"])
+        stack.extend(obj["children"].values())
+    return json.dumps(entry).encode()
+
+
+def _iter_cache_files(cache_dir: Path) -> Iterator[tuple[str, bytes]]:
+    for path in sorted(cache_dir.rglob("*")):
+        name = path.relative_to(cache_dir).as_posix()
+        if name.split("/", 1)[0] in BUNDLE_EXCLUDE or path.suffix in BUNDLE_EXCLUDE_SUFFIXES or not path.is_file():
+            continue
+        if (data := read_cache(path)) is not None:
+            yield name, data
+
+
+def export_bundle(
+    cache_dir: Path,
+    bundle: Path,
+    roots: Sequence[str],
+    entries: Iterable[tuple[str, bytes]] = (),
+) -> int:
+    """Export a cache directory to a compressed bundle file.
+
+    Entries are stored once per content (under their digest), and listed in a manifest.
+    The file paths recorded in collection cache entries are made relative to the given roots,
+    so that the bundle can be imported in a checkout at another location.
+
+    Arguments:
+        cache_dir: The cache directory.
+        bundle: The bundle file to write.
+        roots: The directories that file paths are made relative to, for example the search paths.
+        entries: Collection cache entries, as tuples of (name, data), for example
+            from [`CollectionCache.iter_entries`][mkdocstrings_handlers.python.store.CollectionCache.iter_entries].
+
+    Returns:
+        The number of exported entries.
+    """
+    roots = [os.path.abspath(root) for root in roots]
+    manifest: dict[str, str] = {}
+    with zipfile.ZipFile(bundle, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, data in (*_iter_cache_files(cache_dir), *entries):
+            if name.startswith("objects/"):
+                data = _relocate_entry(data, lambda file_path: _portable_path(file_path, roots))  # noqa: PLW2901
+            digest = content_hash(data)
+            if digest not in manifest.values():
+                archive.writestr(f"blobs/{digest}", data)
+            manifest[name] = digest
+        archive.writestr("manifest.json", json.dumps({"version": BUNDLE_VERSION, "entries": manifest}))
+    return len(manifest)
+
+
+def import_bundle(
+    bundle: Path,
+    cache_dir: Path,
+    roots: Sequence[str],
+    put_entry: Optional[Callable[[bytes], None]] = None,
+) -> int:
+    """Import a bundle file into a cache directory.
+
+    Entries whose contents do not match their digest are skipped.
+
+    Arguments:
+        bundle: The bundle file to read.
+        cache_dir: The cache directory.
+        roots: The directories that file paths were made relative to, in the same order as when exporting.
+        put_entry: The function storing collection cache entries, for example
+            [`CollectionCache.put_entry`][mkdocstrings_handlers.python.store.CollectionCache.put_entry].
+            Without it, they are skipped.
+
+    Raises:
+        ValueError: When the bundle has an unsupported format.
+
+    Returns:
+        The number of imported entries.
+    """
+    roots = [os.path.abspath(root) for root in roots]
+    imported = 0
+    with zipfile.ZipFile(bundle) as archive:
+        manifest = json.loads(archive.read("manifest.json"))
+        if manifest.get("version") != BUNDLE_VERSION:
+            raise ValueError(f"Unsupported cache bundle version: {manifest.get('version')}")
+        for name, digest in manifest["entries"].items():
+            data = archive.read(f"blobs/{digest}")
+            if content_hash(data) != digest:
+                logger.debug(f"Skipping corrupted cache bundle entry {name}")
+                continue
+            if (path := _bundle_entry_path(cache_dir, name)) is None:
+                logger.warning(f"Skipping cache bundle entry {name}: it would be written outside of {cache_dir}")
+                continue
+            if name.startswith("objects/"):
+                if put_entry is None:
+                    continue
+                put_entry(_relocate_entry(data, lambda file_path: _local_path(file_path, roots)))
+            else:
+                write_cache(path, data)
+            imported += 1
+    return imported
+
+
+def _bundle_entry_path(cache_dir: Path, name: str) -> Optional[Path]:
+    # Bundles can come from untrusted sources: entries must not be written outside of the cache directory.
+    for pure_path in (PurePosixPath(name), PureWindowsPath(name)):
+        if pure_path.is_absolute() or pure_path.drive or pure_path.root or ".." in pure_path.parts:
+            return None
+    path = cache_dir / name
+    root = cache_dir.resolve()
+    resolved = path.resolve()
+    if resolved == root or root not in resolved.parents:
+        return None
+    return path
@@ -0,0 +1,396 @@
+"""This module implements the command line interface of the handler.
+
+```console
+$ python -m mkdocstrings_handlers.python prewarm -f mkdocs.yml
+```
+
+The `prewarm` command collects every object documented with `:::` instructions in a MkDocs project,
+and stores them in the handler's cache directory (see the `cache_dir` handler option), along with
+the canonical paths of their objects (used by mkdocstrings to find the aliases of rendered headings),
+so that a subsequent `mkdocs build` does not have to start any `pytkdocs` subprocess.
+It can run as a separate CI job, before building the documentation.
+
+The `export-cache` and `import-cache` commands write the cache directory to a single compressed bundle file,
+and restore it from such a file, for example to share caches between CI runners as build artifacts.
+
+```console
+$ python -m mkdocstrings_handlers.python export-cache cache.zip
+$ python -m mkdocstrings_handlers.python import-cache cache.zip
+```
+
+The `profile-stats` command merges the profiles written when profiling is enabled
+(see the `profile_dir` handler option), and prints the most expensive identifiers and functions.
+
+```console
+$ python -m mkdocstrings_handlers.python profile-stats profiles --phase worker.collect
+```
+
+The `split-pages` command splits the documentation of a large module into one Markdown page per class and submodule,
+and an index page rendering the module with a summary of its classes and submodules (see the `summary` option).
+
+```console
+$ python -m mkdocstrings_handlers.python split-pages big_package.module -o docs/reference/module
+```
+"""
+
+import argparse
+import asyncio
+import json
+import pstats
+import re
+import sys
+import textwrap
+import zipfile
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from typing import Any, Optional
+
+import yaml
+from mkdocs.config import load_config
+from mkdocs.config.defaults import MkDocsConfig
+from mkdocstrings import CollectionError
+
+from mkdocstrings_handlers.python.debug import get_version
+from mkdocstrings_handlers.python.handler import PythonHandler, get_handler
+from mkdocstrings_handlers.python.rendering import iter_tree
+
+AUTODOC_RE = re.compile(r"^(?:#{1,6} *)?::: ?(?P<name>.+?) *$")
+"""The regular expression matching autodoc instructions (same as mkdocstrings)."""
+
+NO_CACHE_DIR = "No cache directory configured, use the `cache_dir` handler option or --cache-dir"
+"""The error message printed when no cache directory is configured."""
+
+FENCE_RE = re.compile(r"^ *(`{3,}|~{3,})")
+"""The regular expression matching code fences, in which autodoc instructions are ignored."""
+
+
+def iter_autodoc_blocks(markdown: str) -> Iterator[tuple[str, dict[str, Any]]]:
+    """Find the autodoc instructions of a Markdown document.
+
+    Arguments:
+        markdown: The contents of the document.
+
+    Yields:
+        Tuples of (identifier, configuration of the instruction).
+    """
+    lines = markdown.splitlines()
+    fence = ""
+    for index, line in enumerate(lines):
+        if match := FENCE_RE.match(line):
+            if not fence:
+                fence = match.group(1)
+            elif match.group(1).startswith(fence):
+                fence = ""
+            continue
+        if fence or not (match := AUTODOC_RE.match(line)):
+            continue
+        block = []
+        for block_line in lines[index + 1 :]:
+            if block_line.strip() and not block_line[0].isspace():
+                break
+            block.append(block_line)
+        config = yaml.safe_load(textwrap.dedent("\n".join(block))) or {}
+        yield match.group("name"), config
+
+
+def find_autodoc_blocks(docs_dir: Path) -> Iterator[tuple[str, dict[str, Any]]]:
+    """Find the autodoc instructions of all the Markdown documents of a project.
+
+    Arguments:
+        docs_dir: The documentation directory.
+
+    Yields:
+        Tuples of (identifier, configuration of the instruction).
+    """
+    for path in sorted(docs_dir.rglob("*.md")):
+        yield from iter_autodoc_blocks(path.read_text(encoding="utf8"))
+
+
+async def _prewarm(handler: PythonHandler, blocks: Sequence[tuple[str, dict[str, Any]]]) -> tuple[int, set[str]]:
+    # Return the number of objects that could not be collected, and the paths of the collected objects.
+    paths: set[str] = set()
+    groups: dict[str, tuple[dict[str, Any], list[str]]] = {}
+    for identifier, config in blocks:
+        options = handler.get_options(config.get("options", {}))
+        key = json.dumps(options, sort_keys=True, default=str)
+        groups.setdefault(key, (dict(options), []))[1].append(identifier)
+
+    async def prewarm(options: dict[str, Any], identifiers: list[str]) -> int:
+        try:
+            collected = await handler.acollect_many(identifiers, options)
+        except CollectionError:
+            # Find out which objects failed.
+            results = await asyncio.gather(
+                *(handler.acollect(identifier, options) for identifier in identifiers),
+                return_exceptions=True,
+            )
+            failures = 0
+            for identifier, result in zip(identifiers, results):
+                if isinstance(result, CollectionError):
+                    print(f"Could not collect {identifier}: {result}", file=sys.stderr)
+                    failures += 1
+                elif not isinstance(result, BaseException):
+                    paths.update(path for path, _ in iter_tree(result))
+            return failures
+        paths.update(path for obj in collected for path, _ in iter_tree(obj))
+        return 0
+
+    failures = sum(await asyncio.gather(*(prewarm(*group) for group in groups.values())))
+    return failures, paths
+
+
+def _load_config(
+    config_file: str,
+    cache_dir: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> tuple[MkDocsConfig, str, dict[str, Any]]:
+    mkdocs_config = load_config(config_file)
+    plugin = mkdocs_config.plugins["mkdocstrings"]
+    handler_config = dict(plugin.config["handlers"].get("python", {}))
+    if cache_dir:
+        handler_config["cache_dir"] = str(Path(cache_dir).absolute())
+    if max_workers:
+        handler_config["max_workers"] = max_workers
+    return mkdocs_config, plugin.config["default_handler"], handler_config
+
+
+def prewarm(config_file: str, *, cache_dir: Optional[str] = None, max_workers: Optional[int] = None) -> int:
+    """Collect every object documented in a MkDocs project, and store them in the cache directory.
+
+    The objects of the collected trees are also resolved, since mkdocstrings asks for the aliases
+    of each rendered heading (see [`get_aliases`][mkdocstrings_handlers.python.handler.PythonHandler.get_aliases]).
+
+    Arguments:
+        config_file: The path to the MkDocs configuration file.
+        cache_dir: The cache directory, overriding the `cache_dir` handler option.
+        max_workers: The number of subprocesses to use, overriding the `max_workers` handler option.
+
+    Returns:
+        An exit code.
+    """
+    mkdocs_config, default_handler, handler_config = _load_config(config_file, cache_dir, max_workers)
+    if not handler_config.get("cache_dir"):
+        print(NO_CACHE_DIR, file=sys.stderr)
+        return 2
+
+    blocks = [
+        (identifier, config)
+        for identifier, config in find_autodoc_blocks(Path(mkdocs_config["docs_dir"]))
+        if config.get("handler", default_handler) == "python"
+    ]
+    handler = get_handler(handler_config, mkdocs_config, theme=mkdocs_config["theme"].name)
+    try:
+        failures, paths = asyncio.run(_prewarm(handler, blocks))
+        # Each rendered heading is resolved to find its aliases: store them too.
+        handler.resolve(sorted(paths))
+    except CollectionError as error:
+        print(f"Could not resolve the collected objects: {error}", file=sys.stderr)
+        return 1
+    finally:
+        handler.teardown()
+    if failures:
+        print(f"Could not collect {failures} of {len(blocks)} objects", file=sys.stderr)
+        return 1
+    print(f"Collected {len(blocks)} objects into {handler_config['cache_dir']}")
+    return 0
+
+
+def export_cache(config_file: str, bundle: str, *, cache_dir: Optional[str] = None) -> int:
+    """Export the cache directory of a MkDocs project to a bundle file.
+
+    Arguments:
+        config_file: The path to the MkDocs configuration file.
+        bundle: The bundle file to write.
+        cache_dir: The cache directory, overriding the `cache_dir` handler option.
+
+    Returns:
+        An exit code.
+    """
+    mkdocs_config, _, handler_config = _load_config(config_file, cache_dir)
+    if not handler_config.get("cache_dir"):
+        print(NO_CACHE_DIR, file=sys.stderr)
+        return 2
+    handler = get_handler(handler_config, mkdocs_config, theme=mkdocs_config["theme"].name)
+    try:
+        exported = handler.export_cache(Path(bundle))
+    finally:
+        handler.teardown()
+    print(f"Exported {exported} entries to {bundle}")
+    return 0
+
+
+def import_cache(config_file: str, bundle: str, *, cache_dir: Optional[str] = None) -> int:
+    """Import a bundle file into the cache directory of a MkDocs project.
+
+    Arguments:
+        config_file: The path to the MkDocs configuration file.
+        bundle: The bundle file to read.
+        cache_dir: The cache directory, overriding the `cache_dir` handler option.
+
+    Returns:
+        An exit code.
+    """
+    mkdocs_config, _, handler_config = _load_config(config_file, cache_dir)
+    if not handler_config.get("cache_dir"):
+        print(NO_CACHE_DIR, file=sys.stderr)
+        return 2
+    handler = get_handler(handler_config, mkdocs_config, theme=mkdocs_config["theme"].name)
+    try:
+        imported = handler.import_cache(Path(bundle))
+    except (OSError, ValueError, zipfile.BadZipFile) as error:
+        print(f"Could not import {bundle}: {error}", file=sys.stderr)
+        return 1
+    finally:
+        handler.teardown()
+    print(f"Imported {imported} entries from {bundle}")
+    return 0
+
+
+def profile_stats(profile_dir: str, *, phase: Optional[str] = None, sort: str = "cumulative", limit: int = 30) -> int:
+    """Merge and print the profiles written in a directory.
+
+    Arguments:
+        profile_dir: The directory containing the profiles.
+        phase: Only merge the profiles of this phase (`handler.collect`, `handler.render` or `worker.collect`).
+        sort: The key to sort functions by, see [`pstats.Stats.sort_stats`][].
+        limit: The number of identifiers and functions to print.
+
+    Returns:
+        An exit code.
+    """
+    files = sorted(Path(profile_dir).glob(f"{phase or '*'}-*.prof"))
+    if not files:
+        print(f"No profiles found in {profile_dir}", file=sys.stderr)
+        return 1
+
+    totals: dict[tuple[str, str], float] = {}
+    for file in files:
+        file_phase, identifier = file.stem.rsplit("-", 2)[0].split("-", 1)
+        key = (file_phase, identifier)
+        totals[key] = totals.get(key, 0.0) + pstats.Stats(str(file)).total_tt  # type: ignore[attr-defined]
+    print(f"{'Seconds':>10}  {'Phase':<16}  Identifier")
+    for (file_phase, identifier), total in sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]:
+        print(f"{total:>10.3f}  {file_phase:<16}  {identifier}")
+    print()
+
+    stats = pstats.Stats(*map(str, files), stream=sys.stdout)
+    stats.sort_stats(sort).print_stats(limit)
+    return 0
+
+
+def _page_names(names: list[str]) -> list[str]:
+    # Page names must not collide with the index page, nor with each other on case-insensitive file systems.
+    taken = {"index"}
+    pages = []
+    for name in names:
+        page = name
+        suffix = 1
+        while page.lower() in taken:
+            suffix += 1
+            page = f"{name}-{suffix}"
+        taken.add(page.lower())
+        pages.append(page)
+    return pages
+
+
+def split_pages(
+    identifier: str,
+    output_dir: str,
+    config_file: str = "mkdocs.yml",
+    *,
+    heading_level: int = 1,
+) -> int:
+    """Write one Markdown page per class and submodule of a module, and an index page summarizing them.
+
+    Pages are named after the objects. A number is appended to the names that would collide
+    with the index page or, on case-insensitive file systems, with other pages (`Foo.md`, `foo-2.md`).
+
+    Arguments:
+        identifier: The module to split.
+        output_dir: The directory in which to write the pages.
+        config_file: The path to the MkDocs configuration file.
+        heading_level: The heading level of the objects documented in each page.
+
+    Returns:
+        An exit code.
+    """
+    mkdocs_config, _, handler_config = _load_config(config_file)
+    handler = get_handler(handler_config, mkdocs_config, theme=mkdocs_config["theme"].name)
+    try:
+        root = handler.collect(identifier, handler.get_options({}))
+    except CollectionError as error:
+        print(f"Could not collect {identifier}: {error}", file=sys.stderr)
+        return 1
+    finally:
+        handler.teardown()
+
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    options = f"    options:\n      show_root_heading: true\n      heading_level: {heading_level}\n"
+    (output / "index.md").write_text(f"::: {identifier}\n{options}      summary: true\n")
+    members = [member for member in root["children"] if member["category"] in {"class", "module"}]
+    for member, page in zip(members, _page_names([member["name"] for member in members])):
+        (output / f"{page}.md").write_text(f"::: {member['path']}\n{options}")
+    print(f"Wrote {len(members) + 1} pages to {output_dir}")
+    return 0
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """Return the CLI argument parser.
+
+    Returns:
+        An argparse parser.
+    """
+    parser = argparse.ArgumentParser(prog="mkdocstrings-python-legacy")
+    parser.add_argument("-V", "--version", action="version", version=f"%(prog)s {get_version()}")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    prewarm_parser = subparsers.add_parser("prewarm", help="Collect documented objects into the cache directory.")
+    prewarm_parser.add_argument("-f", "--config-file", default="mkdocs.yml", help="The MkDocs configuration file.")
+    prewarm_parser.add_argument("-c", "--cache-dir", help="The cache directory (default: `cache_dir` option).")
+    prewarm_parser.add_argument("-j", "--workers", type=int, help="The number of subprocesses to use.")
+
+    for name, help_text in (
+        ("export-cache", "Export the cache directory to a bundle file."),
+        ("import-cache", "Import a bundle file into the cache directory."),
+    ):
+        bundle_parser = subparsers.add_parser(name, help=help_text)
+        bundle_parser.add_argument("bundle", help="The bundle file.")
+        bundle_parser.add_argument("-f", "--config-file", default="mkdocs.yml", help="The MkDocs configuration file.")
+        bundle_parser.add_argument("-c", "--cache-dir", help="The cache directory (default: `cache_dir` option).")
+
+    split_parser = subparsers.add_parser("split-pages", help="Split a module into one page per class and submodule.")
+    split_parser.add_argument("identifier", help="The module to split.")
+    split_parser.add_argument("-o", "--output-dir", required=True, help="The directory in which to write the pages.")
+    split_parser.add_argument("-f", "--config-file", default="mkdocs.yml", help="The MkDocs configuration file.")
+    split_parser.add_argument("-l", "--heading-level", type=int, default=1, help="The heading level of the objects.")
+
+    stats_parser = subparsers.add_parser("profile-stats", help="Merge and print profiles.")
+    stats_parser.add_argument("profile_dir", help="The directory containing the profiles.")
+    stats_parser.add_argument("-p", "--phase", help="Only merge the profiles of this phase.")
+    stats_parser.add_argument("-s", "--sort", default="cumulative", help="The key to sort functions by.")
+    stats_parser.add_argument("-n", "--limit", type=int, default=30, help="The number of entries to print.")
+    return parser
+
+
+def main(args: Optional[list[str]] = None) -> int:
+    """Run the main program.
+
+    This function is executed when you type `mkdocstrings-python-legacy` or `python -m mkdocstrings_handlers.python`.
+
+    Parameters:
+        args: Arguments passed from the command line.
+
+    Returns:
+        An exit code.
+    """
+    opts = get_parser().parse_args(args=args)
+    if opts.command == "export-cache":
+        return export_cache(opts.config_file, opts.bundle, cache_dir=opts.cache_dir)
+    if opts.command == "import-cache":
+        return import_cache(opts.config_file, opts.bundle, cache_dir=opts.cache_dir)
+    if opts.command == "split-pages":
+        return split_pages(opts.identifier, opts.output_dir, opts.config_file, heading_level=opts.heading_level)
+    if opts.command == "profile-stats":
+        return profile_stats(opts.profile_dir, phase=opts.phase, sort=opts.sort, limit=opts.limit)
+    return prewarm(opts.config_file, cache_dir=opts.cache_dir, max_workers=opts.workers)
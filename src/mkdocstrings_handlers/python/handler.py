@@ -3,33 +3,89 @@
 It collects data with [`pytkdocs`](https://github.com/pawamoy/pytkdocs).
 """
 
+import asyncio
 import json
+import multiprocessing
 import os
-import posixpath
 import sys
+import threading
 import traceback
-from collections.abc import Iterator, Mapping, MutableMapping
+from collections import Counter
+from collections.abc import Generator, Iterable, Iterator, Mapping, MutableMapping
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import AbstractContextManager, nullcontext
 from copy import deepcopy
+from dataclasses import asdict
+from inspect import unwrap
 from pathlib import Path
-from subprocess import PIPE, Popen
-from typing import Any, BinaryIO, ClassVar, Optional
+from typing import Any, BinaryIO, ClassVar, NamedTuple, Optional
 
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
 from mkdocs.config.defaults import MkDocsConfig
 from mkdocs.exceptions import PluginError
-from mkdocstrings import BaseHandler, CollectionError, CollectorItem, Inventory, get_logger
+from mkdocstrings import BaseHandler, CollectionError, CollectorItem, get_logger
 
+from mkdocstrings_handlers.python.cache import CacheStats, export_bundle, import_bundle, prune_cache
+from mkdocstrings_handlers.python.debug import get_version
+from mkdocstrings_handlers.python.inventory import InventoryPrefetcher
+from mkdocstrings_handlers.python.memory import MemoryReport
+from mkdocstrings_handlers.python.process import WorkerPool
 from mkdocstrings_handlers.python.rendering import (
+    PREHIGHLIGHTED_VAR,
+    compile_filters,
+    do_brief_text,
     do_brief_xref,
+    draft_highlighted,
+    filter_tree,
+    highlight_source_snippets,
+    iter_source_snippets,
+    iter_tree,
+    prehighlighted,
     rebuild_category_lists,
+    release_rendered,
     sort_key_alphabetical,
     sort_key_source,
     sort_object,
 )
+from mkdocstrings_handlers.python.scheduling import CollectionCosts, schedule
+from mkdocstrings_handlers.python.store import CollectionCache
+from mkdocstrings_handlers.python.trees import CollectedTree, CollectedTrees, compact_tree
+from mkdocstrings_handlers.python.worker import IMPORT_TIMES_ENV, PROFILE_DIR_ENV, SegmentProfiler, profiled
 
 # TODO: add a deprecation warning once the new handler handles 95% of use-cases
 
 logger = get_logger(__name__)
 
+WORKER_PATH = str(Path(__file__).with_name("worker.py"))
+"""The path to the [worker script][mkdocstrings_handlers.python.worker] run in the subprocess."""
+
+DRAFT_ENV = "MKDOCSTRINGS_PYTHON_LEGACY_DRAFT"
+"""The environment variable enabling the draft mode, see the `draft` handler option."""
+
+DRAFT_OPTIONS = {"show_source": False, "show_signature_annotations": False}
+"""The options overridden in draft mode, whatever their global or local value."""
+
+IMPORT_REPORT_SIZE = 20
+"""The number of modules reported at the end of the build, when import times are measured."""
+
+TEMPLATES_CACHE_PATTERN = "__mkdocstrings_python_legacy_%s.v2.cache"
+"""The file name pattern of compiled templates.
+
+Jinja compiles filter calls differently depending on the filters installed in the environment,
+but only invalidates compiled templates when their source changes:
+the pattern is versioned when the filters installed by the handler change kind.
+"""
+
+
+class _Selection(NamedTuple):
+    # How an object is collected, and which members are returned.
+    tree_key: str
+    pytkdocs_options: dict[str, Any]
+    members: Any
+    filters: Optional[list[str]]
+    reusable: bool
+
 
 class PythonHandler(BaseHandler):
     """The Python handler class."""
@@ -56,6 +112,9 @@ class PythonHandler(BaseHandler):
     When re-collecting the object, we have no use for its members, or for its docstring being parsed.
     This is why the fallback configuration filters every member out, and uses the Markdown style,
     which we know will not generate any warnings.
+
+    The handler itself does not use this configuration to get aliases:
+    it only resolves identifiers, see [`resolve`][mkdocstrings_handlers.python.handler.PythonHandler.resolve].
     """
 
     default_config: ClassVar[dict] = {
@@ -74,6 +133,7 @@ class PythonHandler(BaseHandler):
         "group_by_category": True,
         "heading_level": 2,
         "members_order": "alphabetical",
+        "summary": False,
     }
     """
     **Headings options:**
@@ -97,6 +157,9 @@ class PythonHandler(BaseHandler):
         The `members` option takes precedence over `filters` (filters will still be applied recursively
         to lower members in the hierarchy). Default: `["!^_[^_]"]`.
     - `group_by_category` (`bool`): Group the object's children by categories: attributes, classes, functions, and modules. Default: `True`.
+    - `summary` (`bool`): Render the classes and modules of the root object as a summary table,
+        linking to their documentation, instead of rendering them in full.
+        See the `split-pages` command to generate one page per class and module. Default: `False`.
 
     **Docstrings options:**
 
@@ -118,8 +181,10 @@ class PythonHandler(BaseHandler):
     def __init__(self, config: dict[str, Any], base_dir: Path, **kwargs: Any) -> None:
         """Initialize the handler.
 
-        When instantiating a Python handler, we open a `pytkdocs` subprocess in the background with `subprocess.Popen`.
-        It will allow us to feed input to and read output from this subprocess, keeping it alive during
+        When instantiating a Python handler, we prepare a pool of `pytkdocs` subprocesses
+        (see [`WorkerPool`][mkdocstrings_handlers.python.process.WorkerPool]).
+        Subprocesses are opened in the background when the first objects are collected.
+        It will allow us to feed input to and read output from these subprocesses, keeping them alive during
         the whole documentation generation. Spawning a new Python subprocess for each "autodoc" instruction would be
         too resource intensive, and would slow down `mkdocstrings` a lot.
 
@@ -133,14 +198,30 @@ class PythonHandler(BaseHandler):
         self.base_dir = base_dir
         self.config = config
         self.global_options = config.get("options", {})
+        self._render_workers = config.get("render_workers", 0)
+        self._stats = {"memory": CacheStats(), "disk": CacheStats()}
+        self._collected = CollectedTrees(config.get("max_memory_size", 0) * 1024 * 1024, self._stats["memory"])
+        self._parsing_errors: dict[str, dict[str, list[str]]] = {}
+        self._filter_locally = config.get("filter_locally", False)
+        self._release_rendered = config.get("release_rendered", False)
+        self._rendering: Counter[str] = Counter()
+        self._rendering_lock = threading.Lock()
+        self._draft = bool(config.get("draft", False) or os.environ.get(DRAFT_ENV))
+        if self._draft:
+            logger.info(
+                "Draft mode: source code, signature annotations and cross-references to bases are not rendered, "
+                "and headings are not highlighted",
+            )
+        self._resolved: dict[str, Optional[dict[str, Optional[str]]]] = {}
+        self._render_pool: Optional[ProcessPoolExecutor] = None
+        self._inventories = InventoryPrefetcher()
 
-        logger.debug("Opening 'pytkdocs' subprocess")
         env = os.environ.copy()
         env["PYTHONUNBUFFERED"] = "1"
 
         paths = config.get("paths") or []
         if not paths and self.base_dir:
-            paths.append(self.base_dir)
+            paths.append(str(self.base_dir))
         search_paths = []
         for path in paths:
             if not os.path.isabs(path) and self.base_dir:
@@ -149,6 +230,28 @@ class PythonHandler(BaseHandler):
                 search_paths.append(path)
         self._paths = search_paths
 
+        cache_dir = config.get("cache_dir")
+        if cache_dir and not os.path.isabs(cache_dir) and self.base_dir:
+            cache_dir = os.path.abspath(os.path.join(self.base_dir, cache_dir))
+        self._cache_dir: Optional[Path] = Path(cache_dir) if cache_dir else None
+        self._costs = CollectionCosts(self._cache_dir / "costs.json" if self._cache_dir else None)
+        self._collection_cache = (
+            CollectionCache(self._cache_dir / "objects.store", self._stats["disk"]) if self._cache_dir else None
+        )
+        self._max_cache_size = config.get("max_cache_size", 0) * 1024 * 1024
+        self._collection_version = json.dumps([get_version("pytkdocs"), config.get("setup_commands")])
+
+        profile_dir = config.get("profile_dir") or os.environ.get(PROFILE_DIR_ENV)
+        if profile_dir and not os.path.isabs(profile_dir) and self.base_dir:
+            profile_dir = os.path.abspath(os.path.join(self.base_dir, profile_dir))
+        self._profile_dir: Optional[Path] = Path(profile_dir) if profile_dir else None
+        if profile_dir:
+            env[PROFILE_DIR_ENV] = profile_dir
+        self._import_times: Optional[dict[str, tuple[float, str]]] = {} if config.get("import_times") else None
+        if self._import_times is not None:
+            env[IMPORT_TIMES_ENV] = "1"
+        self._memory = MemoryReport() if config.get("memory_report") else None
+
         commands = []
 
         if search_paths:
@@ -167,64 +270,124 @@ class PythonHandler(BaseHandler):
                 ],
             )
 
-        if commands:
-            final_commands = [
-                "import sys",
-                *commands,
-                "from pytkdocs.cli import main as pytkdocs",
-                "pytkdocs(['--line-by-line'])",
-            ]
-            cmd = [sys.executable, "-c", "; ".join(final_commands)]
-        else:
-            cmd = [sys.executable, "-m", "pytkdocs", "--line-by-line"]
+        # The worker is run as a script rather than imported as a module,
+        # to avoid importing this package (and MkDocs) in the subprocess.
+        final_commands = [
+            "import sys",
+            *commands,
+            "import runpy",
+            f"runpy.run_path({WORKER_PATH!r}, run_name='__main__')",
+        ]
+        cmd = [sys.executable, "-c", "; ".join(final_commands)]
 
-        self.process = Popen(  # noqa: S603
+        self.workers = WorkerPool(
             cmd,
-            universal_newlines=True,
-            stdout=PIPE,
-            stdin=PIPE,
-            bufsize=-1,
-            env=env,
+            env,
+            max_workers=config.get("max_workers", 1),
+            max_requests=config.get("max_requests_per_worker", 0),
+            max_rss=config.get("max_worker_rss", 0) * 1024 * 1024,
         )
+        """The pool of worker subprocesses."""
+
+    def export_cache(self, bundle: Path) -> int:
+        """Export the persistent caches to a bundle file.
+
+        File paths are made relative to the search paths and to the Python prefix,
+        so that the bundle can be imported on another machine, or in a checkout at another location.
+        See [`export_bundle`][mkdocstrings_handlers.python.cache.export_bundle].
+
+        Arguments:
+            bundle: The bundle file to write.
+
+        Raises:
+            PluginError: When the `cache_dir` handler option is not set.
+
+        Returns:
+            The number of exported entries.
+        """
+        if not self._cache_dir:
+            raise PluginError("The 'cache_dir' option of the Python handler is not set")
+        self._flush_collected()
+        entries = self._collection_cache.iter_entries() if self._collection_cache else ()
+        return export_bundle(self._cache_dir, bundle, [*self._paths, sys.prefix], entries)
+
+    def import_cache(self, bundle: Path) -> int:
+        """Import the persistent caches from a bundle file.
+
+        See [`import_bundle`][mkdocstrings_handlers.python.cache.import_bundle].
+
+        Arguments:
+            bundle: The bundle file to read.
+
+        Raises:
+            PluginError: When the `cache_dir` handler option is not set.
+
+        Returns:
+            The number of imported entries.
+        """
+        if not self._cache_dir:
+            raise PluginError("The 'cache_dir' option of the Python handler is not set")
+        put_entry = self._collection_cache.put_entry if self._collection_cache else None
+        imported = import_bundle(bundle, self._cache_dir, [*self._paths, sys.prefix], put_entry)
+        self._flush_collected()
+        return imported
 
     def get_inventory_urls(self) -> list[tuple[str, dict[str, Any]]]:
-        """Return the URLs of the inventory files to download."""
-        return [
+        """Return the URLs of the inventory files to download.
+
+        When several inventories are imported, their previously downloaded copies
+        start being parsed concurrently, in other processes
+        (see [`InventoryPrefetcher`][mkdocstrings_handlers.python.inventory.InventoryPrefetcher]).
+        """
+        urls = [
             (inv.pop("url"), inv) if isinstance(inv, dict) else (inv, {})
             for inv in deepcopy(self.config.get("import", []))
         ]
-
-    @classmethod
-    def load_inventory(
-        cls,
+        if self._cache_dir:
+            for _, inv in urls:
+                inv.setdefault("cache_dir", self._cache_dir / "inventories")
+        if len(urls) > 1:
+            for url, inv in urls:
+                self._inventories.prefetch(url, inv.get("base_url"), inv.get("cache_dir"))
+        return urls
+
+    def load_inventory(  # type: ignore[override]
+        self,
         in_file: BinaryIO,
         url: str,
         base_url: Optional[str] = None,
-        **kwargs: Any,  # noqa: ARG003
+        cache_dir: Optional[Path] = None,
+        **kwargs: Any,  # noqa: ARG002
     ) -> Iterator[tuple[str, str]]:
         """Yield items and their URLs from an inventory file streamed from `in_file`.
 
         This implements mkdocstrings' `load_inventory` "protocol" (see plugin.py).
 
+        Items are parsed and yielded one by one. When a cache directory is given,
+        parsed inventories are cached there and reused as long as the file contents do not change
+        (see [`load_inventory_urls`][mkdocstrings_handlers.python.inventory.load_inventory_urls]).
+        Items already parsed in another process since `get_inventory_urls` was called are reused.
+
         Arguments:
             in_file: The binary file-like object to read the inventory from.
             url: The URL that this file is being streamed from (used to guess `base_url`).
             base_url: The URL that this inventory's sub-paths are relative to.
+            cache_dir: The directory in which to cache parsed inventories.
+                It is set by [`get_inventory_urls`][mkdocstrings_handlers.python.handler.PythonHandler.get_inventory_urls]
+                when the `cache_dir` handler option is set.
             **kwargs: Ignore additional arguments passed from the config.
 
         Yields:
             Tuples of (item identifier, item URL).
         """
-        if base_url is None:
-            base_url = posixpath.dirname(url)
-
-        for item in Inventory.parse_sphinx(in_file, domain_filter=("py",)).values():
-            yield item.name, posixpath.join(base_url, item.uri)
+        yield from self._inventories.load(in_file, url, base_url, cache_dir)
 
     def get_options(self, local_options: Mapping[str, Any]) -> MutableMapping[str, Any]:
         """Return the options to use to collect an object.
 
         We merge the global options with the options specific to the object being collected.
+        In draft mode (see the `draft` handler option), the [`DRAFT_OPTIONS`][mkdocstrings_handlers.python.handler.DRAFT_OPTIONS]
+        override them.
 
         Arguments:
             local_options: The selection options.
@@ -232,13 +395,20 @@ class PythonHandler(BaseHandler):
         Returns:
             The options to use to collect an object.
         """
-        return {**self.default_config, **self.global_options, **local_options}
+        options = {**self.default_config, **self.global_options, **local_options}
+        if self._draft:
+            options.update(DRAFT_OPTIONS)
+        return options
 
     def collect(self, identifier: str, options: MutableMapping[str, Any]) -> CollectorItem:
         """Collect the documentation tree given an identifier and selection options.
 
-        In this method, we feed one line of JSON to the standard input of the subprocess that was opened
-        during instantiation of the collector. Then we read one line of JSON on its standard output.
+        In this method, we send one line of JSON to the subprocess that was opened
+        during instantiation of the collector. Then we wait for its one line JSON response.
+        Requests and responses are matched with identifiers, so this method can be called
+        from multiple threads: when all the subprocesses are busy, a new one is started,
+        up to the number set by the `max_workers` handler option.
+        See also [`acollect`][mkdocstrings_handlers.python.handler.PythonHandler.acollect] for asynchronous code.
 
         We load back the JSON text into a Python dictionary.
         If there is a decoding error, we log it as error and raise a CollectionError.
@@ -246,14 +416,53 @@ class PythonHandler(BaseHandler):
         If the dictionary contains an `error` key, we log it  as error (with the optional `traceback` value),
         and raise a CollectionError.
 
-        If the dictionary values for keys `loading_errors` and `parsing_errors` are not empty,
-        we log them as warnings.
+        If the dictionary value for key `loading_errors` is not empty, we log its items as warnings.
+        The docstring parsing errors found in `parsing_errors` are logged as warnings
+        for the objects that are returned.
 
         Then we pick up the only object within the `objects` list (there's always only one, because we collect
         them one by one), rebuild it's categories lists
         (see [`rebuild_category_lists()`][mkdocstrings_handlers.python.rendering.rebuild_category_lists]),
         and return it.
 
+        Every object of the returned tree is remembered. When an object that was already collected
+        as part of a previous tree is requested again, with the same `filters` and docstring options
+        and no explicit `members`, it is returned directly, without going through the subprocess.
+        When the `max_memory_size` handler option is set, the least recently used trees are forgotten
+        once their total size exceeds it (see [`CollectedTrees`][mkdocstrings_handlers.python.trees.CollectedTrees]).
+
+        When the `filter_locally` handler option is enabled, objects are collected with all their members,
+        once per docstring options. The `members` and `filters` options are then applied by the handler
+        (see [`filter_tree()`][mkdocstrings_handlers.python.rendering.filter_tree]),
+        so that selecting different members of the same object does not require collecting it again.
+
+        Arguments:
+            identifier: The dotted-path of a Python object available in the Python path.
+            options: Selection options, used to alter the data collection done by `pytkdocs`.
+
+        Raises:
+            CollectionError: When there was a problem collecting the object documentation.
+
+        Returns:
+            The collected object-tree.
+        """
+        with profiled(self._profile_dir, "handler.collect", identifier):
+            selection = self._selection(options)
+            obj = self._lookup(identifier, selection)
+            if obj is None:
+                result = self._load_collected(identifier, selection)
+                if result is None:
+                    result = self._communicate(self._collect_request([identifier], selection))
+                    self._store_collected([identifier], selection, result)
+                obj = self._index([identifier], selection, result)[0]
+            return self._select(obj, selection)
+
+    async def acollect(self, identifier: str, options: MutableMapping[str, Any]) -> CollectorItem:
+        """Collect the documentation tree given an identifier and selection options, asynchronously.
+
+        This method works like [`collect`][mkdocstrings_handlers.python.handler.PythonHandler.collect],
+        except that waiting for the subprocess response does not block the event loop.
+
         Arguments:
             identifier: The dotted-path of a Python object available in the Python path.
             options: Selection options, used to alter the data collection done by `pytkdocs`.
@@ -264,21 +473,284 @@ class PythonHandler(BaseHandler):
         Returns:
             The collected object-tree.
         """
+        # Only the work done between awaits is profiled, not the time spent waiting for the subprocess.
+        profiler = SegmentProfiler(self._profile_dir, "handler.collect", identifier)
+        try:
+            with profiler.segment():
+                selection = self._selection(options)
+                obj = self._lookup(identifier, selection)
+                result = self._load_collected(identifier, selection) if obj is None else None
+            if obj is None:
+                if result is None:
+                    result = await self._acommunicate(self._collect_request([identifier], selection), profiler)
+                    with profiler.segment():
+                        self._store_collected([identifier], selection, result)
+                with profiler.segment():
+                    obj = self._index([identifier], selection, result)[0]
+            with profiler.segment():
+                return self._select(obj, selection)
+        finally:
+            profiler.dump()
+
+    async def acollect_many(
+        self,
+        identifiers: Iterable[str],
+        options: MutableMapping[str, Any],
+        max_concurrency: Optional[int] = None,
+    ) -> list[CollectorItem]:
+        """Collect multiple documentation trees concurrently.
+
+        Objects are scheduled according to the time it took to collect them previously
+        (see [`schedule`][mkdocstrings_handlers.python.scheduling.schedule]):
+        the most expensive objects are collected first, and cheap objects are collected in batches.
+        These costs are persisted between builds when the `cache_dir` handler option is set.
+
+        Arguments:
+            identifiers: The dotted-paths of Python objects available in the Python path.
+            options: Selection options, used to alter the data collection done by `pytkdocs`.
+            max_concurrency: The maximum number of requests sent to the subprocesses at the same time.
+                Defaults to the `max_workers` handler option.
+
+        Raises:
+            CollectionError: When there was a problem collecting the documentation of one of the objects.
+
+        Returns:
+            The collected object-trees, in the order of the identifiers.
+        """
+        identifiers = list(identifiers)
+        selection = self._selection(options)
+        semaphore = asyncio.Semaphore(max_concurrency or self.workers.max_workers)
+        results: dict[str, CollectorItem] = {}
+        profilers = {
+            identifier: SegmentProfiler(self._profile_dir, "handler.collect", identifier) for identifier in identifiers
+        }
+        for identifier in identifiers:
+            with profilers[identifier].segment():
+                if (obj := self._lookup(identifier, selection)) is not None:
+                    results[identifier] = obj
+                elif (result := self._load_collected(identifier, selection)) is not None:
+                    results[identifier] = self._index([identifier], selection, result)[0]
+
+        async def acollect(batch: list[str]) -> None:
+            async with semaphore:
+                if len(batch) > 1:
+                    try:
+                        result = await self._acommunicate(self._collect_request(batch, selection))
+                    except CollectionError:
+                        logger.debug("Collecting batched objects one by one")
+                    else:
+                        # Process (and profile) the objects of the batch separately.
+                        for identifier, response in zip(batch, self._split_response(result)):
+                            with profilers[identifier].segment():
+                                self._store_collected([identifier], selection, response)
+                                results[identifier] = self._index([identifier], selection, response)[0]
+                        return
+                for identifier in batch:
+                    profiler = profilers[identifier]
+                    result = await self._acommunicate(self._collect_request([identifier], selection), profiler)
+                    with profiler.segment():
+                        self._store_collected([identifier], selection, result)
+                        results[identifier] = self._index([identifier], selection, result)[0]
+
+        try:
+            uncollected = [identifier for identifier in dict.fromkeys(identifiers) if identifier not in results]
+            await asyncio.gather(*(acollect(batch) for batch in schedule(uncollected, self._costs)))
+            collected = []
+            for identifier in identifiers:
+                with profilers[identifier].segment():
+                    collected.append(self._select(results[identifier], selection))
+            return collected
+        finally:
+            for profiler in profilers.values():
+                profiler.dump()
+
+    def _selection(self, options: Mapping[str, Any]) -> _Selection:
         pytkdocs_options = {}
         for option in ("filters", "members", "docstring_style", "docstring_options"):
             if option in options:
                 pytkdocs_options[option] = options[option]
 
-        logger.debug("Preparing input")
-        json_input = json.dumps({"objects": [{"path": identifier, **pytkdocs_options}]})
+        members = pytkdocs_options.pop("members", None)
+        filters = None
+        if self._filter_locally:
+            # Collect every member, and select them ourselves afterwards.
+            filters = pytkdocs_options.pop("filters", None)
+            tree_key = json.dumps(pytkdocs_options, sort_keys=True)
+            pytkdocs_options["filters"] = []
+            reusable = True
+        else:
+            tree_key = json.dumps(pytkdocs_options, sort_keys=True)
+            if members is not None:
+                pytkdocs_options["members"] = members
+            # When explicit members are selected, only the children
+            # of the root object are complete enough to be reused.
+            reusable = members in (None, True)
+        return _Selection(tree_key, pytkdocs_options, members, filters, reusable)
+
+    def _lookup(self, identifier: str, selection: _Selection) -> Optional[CollectorItem]:
+        if selection.reusable and (obj := self._collected.get(selection.tree_key, identifier)):
+            logger.debug(f"Reusing previously collected object {identifier}")
+            return obj
+        return None
+
+    @staticmethod
+    def _collect_request(identifiers: list[str], selection: _Selection) -> dict[str, Any]:
+        return {"objects": [{"path": identifier, **selection.pytkdocs_options} for identifier in identifiers]}
+
+    def _collection_prefix(self, selection: _Selection) -> str:
+        options = json.dumps(selection.pytkdocs_options, sort_keys=True)
+        return f"{self._collection_version}\0{options}"
+
+    def _load_collected(self, identifier: str, selection: _Selection) -> Optional[dict[str, Any]]:
+        if self._collection_cache is None:
+            return None
+        prefix = self._collection_prefix(selection)
+        with self._measure("decode", identifier):
+            result = self._collection_cache.get(prefix, identifier, subtree=selection.reusable)
+        if result is not None:
+            logger.debug(f"Loading {identifier} from the collection cache")
+        return result
+
+    def _store_collected(self, identifiers: list[str], selection: _Selection, result: Mapping[str, Any]) -> None:
+        # Responses are split per object, and stored before their category lists are rebuilt.
+        if self._collection_cache is None:
+            return
+        prefix = self._collection_prefix(selection)
+        module_files = result.get("module_files", [()] * len(identifiers))
+        for index, (identifier, obj, files) in enumerate(zip(identifiers, result["objects"], module_files)):
+            loading_errors = result["loading_errors"] if index == 0 else []
+            self._collection_cache.set(
+                prefix,
+                identifier,
+                obj,
+                loading_errors,
+                result["parsing_errors"],
+                reusable=selection.reusable,
+                module_files=files,
+            )
 
-        logger.debug("Writing to process' stdin")
-        self.process.stdin.write(json_input + "\n")  # type: ignore[union-attr]
-        self.process.stdin.flush()  # type: ignore[union-attr]
+    def _flush_collected(self) -> None:
+        if self._collection_cache is not None:
+            self._collection_cache.flush(self._max_cache_size)
 
-        logger.debug("Reading process' stdout")
-        stdout = self.process.stdout.readline()  # type: ignore[union-attr]
+    def _record_import_times(self, identifiers: list[str], result: Mapping[str, Any]) -> None:
+        if self._import_times is None:
+            return
+        for identifier, import_times in zip(identifiers, result.get("import_times", ())):
+            for module, seconds in import_times.items():
+                # Each worker imports modules again: keep the slowest import.
+                if seconds > self._import_times.get(module, (0.0, ""))[0]:
+                    self._import_times[module] = (seconds, identifier)
 
+    def _index(self, identifiers: list[str], selection: _Selection, result: Mapping[str, Any]) -> list[CollectorItem]:
+        for loading_error in result["loading_errors"]:
+            logger.warning(loading_error)
+
+        # The size of batched responses is shared evenly between their objects.
+        objects = result["objects"]
+        for identifier, duration in zip(identifiers, result.get("durations", ())):
+            self._costs.record(identifier, duration, result["size"] // len(objects))
+        if self._memory is not None:
+            for identifier, rss in zip(identifiers, result.get("rss", ())):
+                self._memory.record_rss(identifier, rss)
+        self._record_import_times(identifiers, result)
+
+        logger.debug("Rebuilding categories and children lists")
+        self._parsing_errors.setdefault(selection.tree_key, {}).update(result["parsing_errors"])
+        for position, (identifier, collected) in enumerate(zip(identifiers, objects)):
+            with self._measure("rebuild", identifier):
+                rebuild_category_lists(collected)
+                compact_tree(collected)
+            # Evicted trees stay weakly referenced while they are in use.
+            obj = objects[position] = CollectedTree(collected) if selection.reusable else collected
+            roots = [obj] if selection.reusable else obj["children"]
+            self._collected.add(selection.tree_key, roots, result["size"] // len(objects))
+        return objects
+
+    def _select(self, obj: CollectorItem, selection: _Selection) -> CollectorItem:
+        if self._filter_locally:
+            obj = filter_tree(obj, compile_filters(selection.filters), members=selection.members)
+
+        # Parsing errors are logged for the objects that are actually returned.
+        self._log_parsing_errors(obj, self._parsing_errors[selection.tree_key])
+        return obj
+
+    def _communicate(self, request: Mapping[str, Any]) -> dict[str, Any]:
+        """Send a request to the subprocess and return its response.
+
+        Arguments:
+            request: The request.
+
+        Raises:
+            CollectionError: When the response cannot be decoded, or contains an error.
+
+        Returns:
+            The response, with the size of its JSON text in `size`.
+        """
+        logger.debug("Sending request to the worker and waiting for its response")
+        stdout = self._submit(request).result()
+        with self._measure("decode", self._request_label(request)):
+            return self._load_response(stdout)
+
+    async def _acommunicate(
+        self,
+        request: Mapping[str, Any],
+        profiler: Optional[SegmentProfiler] = None,
+    ) -> dict[str, Any]:
+        """Send a request to the subprocess and return its response, asynchronously.
+
+        Arguments:
+            request: The request.
+            profiler: The profiler of the object being collected, to profile the decoding of its response.
+
+        Raises:
+            CollectionError: When the response cannot be decoded, or contains an error.
+
+        Returns:
+            The response, with the size of its JSON text in `size`.
+        """
+        logger.debug("Sending request to the worker and awaiting its response")
+        stdout = await asyncio.wrap_future(self._submit(request))
+        with profiler.segment() if profiler else nullcontext(), self._measure("decode", self._request_label(request)):
+            return self._load_response(stdout)
+
+    @staticmethod
+    def _split_response(result: Mapping[str, Any]) -> list[dict[str, Any]]:
+        # Split a batched response into one response per object. Its size is shared evenly between them.
+        objects = result["objects"]
+        return [
+            {
+                **result,
+                "objects": [obj],
+                "loading_errors": result["loading_errors"] if position == 0 else [],
+                "size": result["size"] // len(objects),
+                **{
+                    key: [result[key][position]]
+                    for key in ("durations", "rss", "module_files", "import_times")
+                    if key in result
+                },
+            }
+            for position, obj in enumerate(objects)
+        ]
+
+    @staticmethod
+    def _request_label(request: Mapping[str, Any]) -> Optional[str]:
+        # A batched response is decoded at once: its memory cannot be attributed to each of its objects.
+        if len(request.get("objects", ())) != 1:
+            return None
+        return request["objects"][0]["path"]
+
+    def _measure(self, phase: str, identifier: Optional[str]) -> AbstractContextManager[None]:
+        if self._memory is None or identifier is None:
+            return nullcontext()
+        return self._memory.measure(phase, identifier)
+
+    def _submit(self, request: Mapping[str, Any]) -> "Future[str]":
+        logger.debug("Preparing input")
+        return self.workers.submit(json.dumps(request))
+
+    @staticmethod
+    def _load_response(stdout: str) -> dict[str, Any]:
         logger.debug("Loading JSON output as Python object")
         try:
             result = json.loads(stdout)
@@ -292,28 +764,106 @@ class PythonHandler(BaseHandler):
                 error += f"\n{result['traceback']}"
             raise CollectionError(error)
 
-        for loading_error in result["loading_errors"]:
-            logger.warning(loading_error)
+        result["size"] = len(stdout)
+        return result
 
-        for errors in result["parsing_errors"].values():
-            for parsing_error in errors:
+    @staticmethod
+    def _log_parsing_errors(obj: CollectorItem, parsing_errors: Mapping[str, list[str]]) -> None:
+        for path, _ in iter_tree(obj):
+            for parsing_error in parsing_errors.get(path, ()):
                 logger.warning(parsing_error)
 
-        # We always collect only one object at a time
-        result = result["objects"][0]
+    def cache_stats(self) -> dict[str, dict[str, int]]:
+        """Return the statistics of the caches of collected objects.
 
-        logger.debug("Rebuilding categories and children lists")
-        rebuild_category_lists(result)
+        The `memory` statistics count the lookups in the objects collected during this build,
+        and the `disk` statistics count the lookups in the `cache_dir` directory.
 
-        return result
+        Returns:
+            The number of hits, misses, evictions and stored bytes of each cache.
+        """
+        return {name: asdict(stats) for name, stats in self._stats.items()}
+
+    def import_times(self) -> list[tuple[str, float, str]]:
+        """Return the modules imported by the subprocesses, slowest first.
+
+        Import times are only measured when the `import_times` handler option is enabled.
+        Each module is attributed to the identifier whose collection triggered its import.
+        The time spent importing a module excludes the time spent importing its own imports.
+
+        Returns:
+            Tuples of (module name, import time in seconds, identifier).
+        """
+        times = sorted((self._import_times or {}).items(), key=lambda item: item[1][0], reverse=True)
+        return [(module, seconds, identifier) for module, (seconds, identifier) in times]
 
     def teardown(self) -> None:
-        """Terminate the opened subprocess, set it to `None`."""
-        logger.debug("Tearing process down")
-        self.process.terminate()
+        """Terminate the opened subprocesses, and report cache statistics."""
+        logger.debug("Tearing processes down")
+        self._costs.save()
+        self.workers.close()
+        self._inventories.close()
+        if self._render_pool is not None:
+            self._render_pool.shutdown()
+            self._render_pool = None
+        self._flush_collected()
+        if self._collection_cache is not None:
+            # Release the store file and its memory map, for example between `mkdocs serve` rebuilds.
+            self._collection_cache.close()
+        if self._cache_dir and self._max_cache_size:
+            prune_cache(self._cache_dir, self._max_cache_size, self._stats["disk"])
+        for name, stats in self._stats.items():
+            if stats.hits or stats.misses:
+                logger.info(
+                    f"Collected objects {name} cache: {stats.hits} hits, {stats.misses} misses, "
+                    f"{stats.evictions} evictions, {stats.bytes} bytes stored",
+                )
+        if import_times := self.import_times()[:IMPORT_REPORT_SIZE]:
+            report = "\n".join(
+                f"  {seconds:8.3f}s  {module} (imported by {identifier})"
+                for module, seconds, identifier in import_times
+            )
+            logger.info(f"Slowest imports of collected objects:\n{report}")
+        if self._memory is not None:
+            logger.info(f"Memory allocated per collected object:\n{self._memory.format()}")
+            self._memory.close()
 
     def render(self, data: CollectorItem, options: MutableMapping[str, Any]) -> str:
         """Render the collected data into HTML."""
+        return "".join(self.render_stream(data, options))
+
+    def render_stream(self, data: CollectorItem, options: MutableMapping[str, Any]) -> Iterator[str]:
+        """Render the collected data into HTML, chunk by chunk.
+
+        The chunks are generated by the template with Jinja's `generate` method,
+        so they can be written out incrementally instead of being assembled in memory.
+        Joined together, they give the same HTML as [`render`][mkdocstrings_handlers.python.handler.PythonHandler.render].
+
+        Arguments:
+            data: The collected data.
+            options: The options to use for rendering.
+
+        Raises:
+            PluginError: When the `members_order` option is not valid.
+
+        Yields:
+            Chunks of HTML.
+        """
+        # Only the production of each chunk is profiled, not the code consuming them.
+        profiler = SegmentProfiler(self._profile_dir, "handler.render", data["path"])
+        chunks = self._render_chunks(data, options)
+        try:
+            while True:
+                with profiler.segment():
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            chunks.close()
+            profiler.dump()
+
+    def _render_chunks(self, data: CollectorItem, options: MutableMapping[str, Any]) -> Generator[str, None, None]:
         template = self.env.get_template(f"{data['category']}.html")
 
         # Heading level is a "state" variable, that will change at each step
@@ -329,25 +879,139 @@ class PythonHandler(BaseHandler):
         else:
             raise PluginError(f"Unknown members_order '{members_order}', choose between 'alphabetical' and 'source'.")
 
-        sort_object(data, sort_function=sort_function)
+        with self._measure("sort", data["path"]):
+            sort_object(data, sort_function=sort_function)
 
-        return template.render(
-            **{"config": options, data["category"]: data, "heading_level": heading_level, "root": True},
-        )
+        render_vars = {
+            "config": options,
+            data["category"]: data,
+            "heading_level": heading_level,
+            "root": True,
+            "summary_path": data["path"] if options.get("summary") else None,
+        }
+
+        paths = [path for path, _ in iter_tree(data)] if self._release_rendered else []
+        with self._rendering_lock:
+            self._rendering.update(paths)
+        try:
+            with self._measure("render", data["path"]):
+                # In summary mode, most of the tree is not rendered: highlighting it in a pool would be wasted.
+                # The snippets are passed through the rendering context, not the environment shared by concurrent renderings.
+                if self._render_workers and options["show_source"] and not options.get("summary"):
+                    render_vars[PREHIGHLIGHTED_VAR] = self._highlight_in_pool(data)
+                yield from template.generate(**render_vars)
+        finally:
+            with self._rendering_lock:
+                self._rendering.subtract(paths)
+                released = {path for path in paths if self._rendering[path] <= 0}
+                for path in released:
+                    del self._rendering[path]
+
+        if self._release_rendered:
+            # With `filter_locally`, the rendered data is a view of the indexed tree: release both.
+            # Only the rendered objects are released, and not the ones another rendering is still using
+            # (for example the parent package of the rendered object, rendered in another thread).
+            for root in self._collected.forget(paths):
+                release_rendered(root, released)
+            release_rendered(data, released)
+
+    def _highlight_in_pool(self, data: CollectorItem) -> dict[tuple[str, int], Markup]:
+        """Highlight the source code of an object-tree in a pool of processes.
+
+        The tree is split at its root children boundaries, and each subtree is highlighted in its own task.
+        The rest of the rendering stays in this process, in order: headings and Markdown conversion
+        register anchors and table of contents entries on the handler's Markdown instance.
+
+        Arguments:
+            data: The collected object-tree, sorted.
+
+        Returns:
+            The highlighted snippets, mapped by (source code, starting line number).
+        """
+        if self._render_pool is None:
+            logger.debug(f"Starting a pool of {self._render_workers} rendering processes")
+            # Don't fork a process running threads (for example the ones downloading inventories).
+            self._render_pool = ProcessPoolExecutor(
+                self._render_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+        chunks = [list(iter_source_snippets(data, recursive=False))]
+        chunks.extend(list(iter_source_snippets(child)) for child in data["children"])
+        chunks = [chunk for chunk in chunks if chunk]
+
+        highlight = unwrap(self.env.filters["highlight"])
+        results = self._render_pool.map(highlight_source_snippets, [highlight] * len(chunks), chunks)
+        return {snippet: markup for chunk, result in zip(chunks, results) for snippet, markup in zip(chunk, result)}
+
+    def resolve(self, identifiers: Iterable[str]) -> dict[str, Optional[dict[str, Optional[str]]]]:
+        """Resolve identifiers to their canonical path and module file path, without collecting them.
+
+        Identifiers are resolved all at once, in a single request to the subprocess,
+        which only imports the objects (see [`resolve`][mkdocstrings_handlers.python.worker.resolve]).
+        Results are remembered for the rest of the build, and stored in the cache directory
+        (when the `cache_dir` handler option is set) as long as their module file, and the files of the modules
+        they go through (for example a package re-exporting them), do not change.
+
+        Arguments:
+            identifiers: The identifiers to resolve.
+
+        Raises:
+            CollectionError: When there was a problem communicating with the subprocess.
+
+        Returns:
+            A dictionary with `path` and `file_path` keys for each identifier,
+            or `None` if the identifier cannot be imported.
+        """
+        identifiers = list(identifiers)
+        unresolved = [identifier for identifier in identifiers if identifier not in self._resolved]
+        if unresolved and self._collection_cache:
+            for identifier in unresolved:
+                if resolved := self._collection_cache.get_resolved(self._collection_version, identifier):
+                    self._resolved[identifier] = resolved
+            unresolved = [identifier for identifier in unresolved if identifier not in self._resolved]
+        if unresolved:
+            result = self._communicate({"resolve": unresolved})
+            self._record_import_times(unresolved, result)
+            self._resolved.update(result["resolved"])
+            if self._collection_cache:
+                for identifier in unresolved:
+                    if resolved := self._resolved[identifier]:
+                        files = result.get("module_files", {}).get(identifier, ())
+                        self._collection_cache.set_resolved(self._collection_version, identifier, resolved, files)
+        return {identifier: self._resolved[identifier] for identifier in identifiers}
 
     def get_aliases(self, identifier: str) -> tuple[str, ...]:
         """Return the aliases of an identifier."""
         try:
-            data = self.collect(identifier, self.fallback_config)
-            return (data["path"],)
-        except (CollectionError, KeyError):
+            resolved = self.resolve([identifier])[identifier]
+        except CollectionError:
             return ()
+        return (resolved["path"],) if resolved and resolved["path"] else ()
 
     def update_env(self, config: dict) -> None:  # noqa: ARG002,D102
         self.env.trim_blocks = True
         self.env.lstrip_blocks = True
         self.env.keep_trailing_newline = False
-        self.env.filters["brief_xref"] = do_brief_xref
+        # In draft mode, no cross-references are generated for autorefs to fix.
+        self.env.filters["brief_xref"] = do_brief_text if self._draft else do_brief_xref
+        if "highlight" in self.env.filters:
+            # Use the source code snippets highlighted in the pool of processes, when there are any.
+            # Always wrapped: compiled templates depend on the kind of filter (see `TEMPLATES_CACHE_PATTERN`).
+            highlight = unwrap(self.env.filters["highlight"])
+            if self._draft:
+                # Headings are not highlighted either: Pygments is not run at all.
+                highlight = draft_highlighted(highlight)
+            self.env.filters["highlight"] = prehighlighted(highlight)
+        if self.env.bytecode_cache is None:
+            # Templates are compiled once, then loaded from the cache in subsequent builds
+            # (the cache is invalidated when the template source changes).
+            if self._cache_dir:
+                templates_cache_dir = self._cache_dir / "templates"
+                templates_cache_dir.mkdir(parents=True, exist_ok=True)
+                self.env.bytecode_cache = FileSystemBytecodeCache(str(templates_cache_dir), TEMPLATES_CACHE_PATTERN)
+            else:
+                self.env.bytecode_cache = FileSystemBytecodeCache(pattern=TEMPLATES_CACHE_PATTERN)
 
 
 def get_handler(
@@ -0,0 +1,222 @@
+"""This module implements utilities to load Sphinx inventories."""
+
+import datetime as dt
+import marshal
+import multiprocessing
+import posixpath
+import zlib
+from collections.abc import Collection, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from mkdocs.utils.cache import download_and_cache_url
+from mkdocstrings import InventoryItem, get_logger
+
+from mkdocstrings_handlers.python.cache import content_hash, read_cache, write_cache
+
+logger = get_logger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+"""The size of the compressed chunks read from inventory files."""
+
+
+def _parse_lines(lines: Iterable[bytes], domain_filter: Collection[str]) -> Iterator[InventoryItem]:
+    for line in lines:
+        item = InventoryItem.parse_sphinx(line.rstrip(b"\r").decode("utf8"), return_none=True)
+        if item and (not domain_filter or item.domain in domain_filter):
+            yield item
+
+
+def iter_sphinx_inventory(in_file: BinaryIO, *, domain_filter: Collection[str] = ()) -> Iterator[InventoryItem]:
+    """Parse a Sphinx v2 inventory file and yield its items one by one.
+
+    Contrary to [`Inventory.parse_sphinx`][mkdocstrings.Inventory.parse_sphinx],
+    the file is decompressed and parsed chunk by chunk, without materializing all the items.
+
+    Arguments:
+        in_file: The binary file-like object to read from.
+        domain_filter: A collection of domain values to allow (and filter out all other ones).
+
+    Yields:
+        The inventory items.
+    """
+    for _ in range(4):
+        in_file.readline()
+    decompressor = zlib.decompressobj()
+    buffer = b""
+    while chunk := in_file.read(CHUNK_SIZE):
+        buffer += decompressor.decompress(chunk)
+        *lines, buffer = buffer.split(b"\n")
+        yield from _parse_lines(lines, domain_filter)
+    buffer += decompressor.flush()
+    yield from _parse_lines(buffer.split(b"\n"), domain_filter)
+
+
+def iter_inventory_urls(in_file: BinaryIO, base_url: str) -> Iterator[tuple[str, str]]:
+    """Yield the Python items of an inventory file and their URLs.
+
+    Arguments:
+        in_file: The binary file-like object to read the inventory from.
+        base_url: The URL that this inventory's sub-paths are relative to.
+
+    Yields:
+        Tuples of (item identifier, item URL).
+    """
+    for item in iter_sphinx_inventory(in_file, domain_filter=("py",)):
+        yield item.name, posixpath.join(base_url, item.uri)
+
+
+def load_inventory_urls(in_file: BinaryIO, base_url: str, cache_dir: Path) -> Iterator[tuple[str, str]]:
+    """Yield the Python items of an inventory file and their URLs, using a cache.
+
+    Parsed inventories are cached in `cache_dir`, keyed by the hash of the inventory contents
+    and of the base URL. They are stored in the compact [`marshal`][] format.
+
+    Arguments:
+        in_file: The binary file-like object to read the inventory from.
+        base_url: The URL that this inventory's sub-paths are relative to.
+        cache_dir: The directory in which to cache parsed inventories.
+
+    Yields:
+        Tuples of (item identifier, item URL).
+    """
+    content = in_file.read()
+    cache_path = cache_dir / f"{content_hash(content, base_url)}.marshal"
+
+    if (cached := read_cache(cache_path)) is not None:
+        try:
+            items = marshal.loads(cached)  # noqa: S302
+        except (EOFError, ValueError, TypeError):
+            logger.debug(f"Discarding invalid inventory cache entry {cache_path}")
+        else:
+            logger.debug(f"Loading inventory from cache entry {cache_path}")
+            yield from items
+            return
+
+    items = []
+    for item in iter_inventory_urls(BytesIO(content), base_url):
+        items.append(item)
+        yield item
+    write_cache(cache_path, marshal.dumps(items))
+
+
+def load_inventory(
+    in_file: BinaryIO,
+    url: str,
+    base_url: Optional[str] = None,
+    cache_dir: Optional[Path] = None,
+) -> Iterator[tuple[str, str]]:
+    """Yield the Python items of an inventory file and their URLs.
+
+    Arguments:
+        in_file: The binary file-like object to read the inventory from.
+        url: The URL that this file is being streamed from (used to guess `base_url`).
+        base_url: The URL that this inventory's sub-paths are relative to.
+        cache_dir: The directory in which to cache parsed inventories, if any.
+
+    Yields:
+        Tuples of (item identifier, item URL).
+    """
+    if base_url is None:
+        base_url = posixpath.dirname(url)
+    if cache_dir is None:
+        yield from iter_inventory_urls(in_file, base_url)
+    else:
+        yield from load_inventory_urls(in_file, base_url, cache_dir)
+
+
+INVENTORY_CACHE_DURATION = dt.timedelta(days=1)
+"""How long mkdocstrings considers downloaded inventory files fresh."""
+
+
+def _cached_only(url: str) -> bytes:
+    raise LookupError(url)
+
+
+def _prefetch_inventory(
+    url: str,
+    base_url: Optional[str],
+    cache_dir: Optional[Path],
+) -> Optional[tuple[str, list[tuple[str, str]]]]:
+    # Parse the copy of an inventory file cached by a previous download, without downloading it.
+    try:
+        content = download_and_cache_url(url, INVENTORY_CACHE_DURATION, download=_cached_only)
+    except LookupError:
+        return None
+    return content_hash(content), list(load_inventory(BytesIO(content), url, base_url, cache_dir))
+
+
+class InventoryPrefetcher:
+    """Parse several inventory files concurrently, ahead of their loading.
+
+    mkdocstrings downloads inventory files concurrently, but loads them one after the other,
+    through [`load_inventory`][mkdocstrings_handlers.python.handler.PythonHandler.load_inventory].
+    To parse them concurrently, each file is parsed in a pool of processes as soon as its URL is known,
+    from the copy that MkDocs cached when downloading it previously (nothing is downloaded).
+    When a file is loaded, the prefetched items are used if the contents of the cached copy are the same.
+    Otherwise (first download, or new contents), the file is parsed as usual.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        """Initialize the prefetcher.
+
+        Arguments:
+            max_workers: The maximum number of processes to use. Default: the number of processors.
+        """
+        self.max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._futures: dict[str, Future[Optional[tuple[str, list[tuple[str, str]]]]]] = {}
+
+    def prefetch(self, url: str, base_url: Optional[str] = None, cache_dir: Optional[Path] = None) -> None:
+        """Start parsing the cached copy of an inventory file.
+
+        Arguments:
+            url: The URL of the inventory file.
+            base_url: The URL that this inventory's sub-paths are relative to.
+            cache_dir: The directory in which to cache parsed inventories, if any.
+        """
+        if self._pool is None:
+            # The handler already runs threads: don't fork.
+            self._pool = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        self._futures[url] = self._pool.submit(_prefetch_inventory, url, base_url, cache_dir)
+
+    def load(
+        self,
+        in_file: BinaryIO,
+        url: str,
+        base_url: Optional[str] = None,
+        cache_dir: Optional[Path] = None,
+    ) -> Iterator[tuple[str, str]]:
+        """Yield the Python items of an inventory file and their URLs, prefetched if possible.
+
+        Arguments:
+            in_file: The binary file-like object to read the inventory from.
+            url: The URL that this file is being streamed from (used to guess `base_url`).
+            base_url: The URL that this inventory's sub-paths are relative to.
+            cache_dir: The directory in which to cache parsed inventories, if any.
+
+        Yields:
+            Tuples of (item identifier, item URL).
+        """
+        if (future := self._futures.pop(url, None)) is not None:
+            content = in_file.read()
+            try:
+                prefetched = future.result()
+            except Exception as error:  # noqa: BLE001
+                logger.debug(f"Could not prefetch inventory {url}: {error}")
+                prefetched = None
+            if prefetched is not None and prefetched[0] == content_hash(content):
+                logger.debug(f"Loading prefetched inventory {url}")
+                yield from prefetched[1]
+                return
+            in_file = BytesIO(content)
+        yield from load_inventory(in_file, url, base_url, cache_dir)
+
+    def close(self) -> None:
+        """Cancel the pending prefetches, and shut the pool of processes down."""
+        self._futures.clear()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,103 @@
+"""This module implements the memory instrumentation of the handler.
+
+When the `memory_report` handler option is enabled, the memory allocated by each phase
+of the collection and rendering of each object is traced with [`tracemalloc`][],
+and the resident set size of the `pytkdocs` subprocesses is recorded after each collected object.
+A report is logged at the end of the build, see [`MemoryReport`][mkdocstrings_handlers.python.memory.MemoryReport].
+"""
+
+import threading
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Optional
+
+PHASES = ("decode", "rebuild", "sort", "render")
+"""The measured phases: decoding (or loading from the cache), rebuilding category lists, sorting and rendering."""
+
+
+class MemoryReport:
+    """The memory allocated by each phase, per identifier.
+
+    For each phase, two sizes are recorded: the memory still allocated at the end of the phase (retained),
+    and the peak memory allocated during the phase. Both are relative to the memory allocated when the phase started.
+    Phases running concurrently (in threads or coroutines) are measured together:
+    use a single worker to get accurate figures.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the report, and start tracing memory allocations."""
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start()
+        self.phases: dict[str, dict[str, tuple[int, int]]] = {}
+        """The retained and peak memory of each phase, in bytes, per identifier."""
+        self.worker_rss: dict[str, int] = {}
+        """The resident set size of the subprocess after collecting each identifier, in bytes."""
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, phase: str, identifier: str) -> Iterator[None]:
+        """Measure the memory allocated by a block of code.
+
+        Measures of the same phase and identifier are added up (retained memory) or maxed (peak memory).
+
+        Arguments:
+            phase: The phase, one of [`PHASES`][mkdocstrings_handlers.python.memory.PHASES].
+            identifier: The identifier of the object being processed.
+
+        Yields:
+            Nothing.
+        """
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            with self._lock:
+                retained, max_peak = self.phases.setdefault(identifier, {}).get(phase, (0, 0))
+                self.phases[identifier][phase] = (retained + current - start, max(max_peak, peak - start))
+
+    def record_rss(self, identifier: str, rss: Optional[int]) -> None:
+        """Record the resident set size of the subprocess after collecting an object.
+
+        Arguments:
+            identifier: The collected identifier.
+            rss: The resident set size in bytes, or `None` if it is not available.
+        """
+        if rss is not None:
+            self.worker_rss[identifier] = rss
+
+    def close(self) -> None:
+        """Stop tracing memory allocations, if the report started it."""
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def format(self, limit: int = 20) -> str:
+        """Format the report, as a table of the identifiers with the highest peak memory first.
+
+        Arguments:
+            limit: The number of identifiers to include.
+
+        Returns:
+            The report.
+        """
+        mib = 1024 * 1024
+        header = "".join(f"{phase:>18}" for phase in PHASES)
+        lines = [f"{header}{'worker RSS':>12}  identifier (retained/peak MiB)"]
+        rows = sorted(
+            self.phases.items(),
+            key=lambda item: max(peak for _, peak in item[1].values()),
+            reverse=True,
+        )
+        for identifier, phases in rows[:limit]:
+            cells = []
+            for phase in PHASES:
+                retained, peak = phases.get(phase, (0, 0))
+                cells.append(f"{retained / mib:>10.1f}/{peak / mib:<7.1f}")
+            rss = self.worker_rss.get(identifier)
+            rss_cell = f"{rss / mib:>12.1f}" if rss is not None else f"{'-':>12}"
+            lines.append(f"{''.join(cells)}{rss_cell}  {identifier}")
+        return "\n".join(lines)
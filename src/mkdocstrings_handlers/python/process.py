@@ -0,0 +1,273 @@
+"""This module implements the handler side of the communication with the worker subprocess.
+
+Requests and responses are exchanged one per line. Requests are prefixed with a request identifier and a space,
+and responses with the [`RESPONSE_MARKER`][mkdocstrings_handlers.python.worker.RESPONSE_MARKER],
+the identifier of the request, and a space:
+
+```
+<id> <JSON request>
+<marker><id> <JSON response>
+```
+
+Many requests can be in flight at the same time, and responses can come back in any order:
+each response is matched to its request thanks to the identifier. The marker cannot appear in JSON texts,
+so responses are found even when other output, for example written by compiled extensions directly
+to the standard output file descriptor, precedes them on the same line. Lines without a marker are logged and ignored.
+A response whose identifier cannot be read fails the oldest pending request,
+instead of letting it wait forever.
+
+The identifier of a response can be followed by a colon and the peak resident set size
+of the subprocess, in bytes (`<marker><id>:<rss> <JSON response>`). It is used to recycle workers
+that grow too large, see [`WorkerPool`][mkdocstrings_handlers.python.process.WorkerPool].
+"""
+
+import threading
+from collections.abc import Mapping, Sequence
+from concurrent.futures import Future
+from itertools import count
+from subprocess import PIPE, Popen
+from typing import Optional
+
+from mkdocstrings import CollectionError, get_logger
+
+from mkdocstrings_handlers.python.worker import RESPONSE_MARKER
+
+logger = get_logger(__name__)
+
+
+class WorkerProcess:
+    """A worker subprocess, accepting concurrent requests."""
+
+    def __init__(self, cmd: Sequence[str], env: Optional[Mapping[str, str]] = None) -> None:
+        """Start the subprocess, and a thread reading its responses.
+
+        Parameters:
+            cmd: The command running the [worker][mkdocstrings_handlers.python.worker].
+            env: The environment variables of the subprocess.
+        """
+        self.process = Popen(  # noqa: S603
+            cmd,
+            universal_newlines=True,
+            stdout=PIPE,
+            stdin=PIPE,
+            bufsize=-1,
+            env=env,
+        )
+        """The subprocess."""
+        self.requests = 0
+        """The number of requests sent to the subprocess."""
+        self.rss = 0
+        """The peak resident set size of the subprocess, in bytes, as last reported by the worker."""
+        self._ids = count()
+        self._pending: dict[int, Future[str]] = {}
+        self._closed = False
+        self._retiring = False
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_responses, name=f"pytkdocs-{self.process.pid}", daemon=True)
+        self._reader.start()
+
+    @property
+    def running(self) -> bool:
+        """Whether the subprocess accepts requests."""
+        return not (self._closed or self._retiring)
+
+    @property
+    def pending(self) -> int:
+        """The number of requests waiting for a response."""
+        return len(self._pending)
+
+    def submit(self, request: str) -> "Future[str]":
+        """Send a request to the subprocess.
+
+        This method can be called from multiple threads.
+
+        Parameters:
+            request: The JSON request, on a single line.
+
+        Raises:
+            CollectionError: When the subprocess is not running anymore.
+
+        Returns:
+            A future resolving to the JSON response.
+        """
+        future: Future[str] = Future()
+        # Requests cannot be cancelled once sent.
+        future.set_running_or_notify_cancel()
+        with self._lock:
+            if self._closed or self._retiring:
+                raise CollectionError("The pytkdocs subprocess is not running")
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+            self.requests += 1
+            try:
+                self.process.stdin.write(f"{request_id} {request}\n")  # type: ignore[union-attr]
+                self.process.stdin.flush()  # type: ignore[union-attr]
+            except OSError as error:
+                del self._pending[request_id]
+                raise CollectionError(f"Could not write to the pytkdocs subprocess: {error}") from error
+        return future
+
+    def request(self, request: str) -> str:
+        """Send a request to the subprocess, and wait for its response.
+
+        Parameters:
+            request: The JSON request, on a single line.
+
+        Returns:
+            The JSON response.
+        """
+        return self.submit(request).result()
+
+    def retire(self) -> None:
+        """Stop accepting requests, and let the subprocess exit once it has answered the pending ones."""
+        with self._lock:
+            self._retiring = True
+            if not self._pending:
+                self._close_stdin()
+
+    def close(self) -> None:
+        """Terminate the subprocess.
+
+        Requests still waiting for a response fail with a `CollectionError`.
+        """
+        self.process.terminate()
+        self.process.wait()
+        self._reader.join()
+
+    def _close_stdin(self) -> None:
+        # The worker exits when its standard input is closed.
+        try:
+            self.process.stdin.close()  # type: ignore[union-attr]
+        except OSError as error:
+            logger.debug(f"Could not close the input of the pytkdocs subprocess: {error}")
+
+    def _read_responses(self) -> None:
+        for line in self.process.stdout:  # type: ignore[union-attr]
+            position = line.rfind(RESPONSE_MARKER)
+            if position == -1:
+                logger.warning(f"Ignoring unexpected output of the pytkdocs subprocess: {line.rstrip()}")
+                continue
+            if position:
+                logger.warning(f"Ignoring unexpected output of the pytkdocs subprocess: {line[:position]}")
+            header, _, response = line[position + len(RESPONSE_MARKER) :].partition(" ")
+            request_id, _, rss = header.partition(":")
+            future: Optional[Future[str]]
+            with self._lock:
+                mangled = not request_id.isdigit() or int(request_id) not in self._pending
+                if mangled:
+                    # Fail the oldest request, rather than letting it wait forever.
+                    future = self._pending.pop(min(self._pending)) if self._pending else None
+                else:
+                    future = self._pending.pop(int(request_id))
+                    if rss.isdigit():
+                        self.rss = int(rss)
+                if self._retiring and not self._pending:
+                    self._close_stdin()
+            if future is None:
+                logger.warning(f"Ignoring unexpected response of the pytkdocs subprocess: {line.rstrip()}")
+            elif mangled:
+                error = f"Unreadable response of the pytkdocs subprocess: {line.rstrip()}"
+                future.set_exception(CollectionError(error))
+            else:
+                future.set_result(response)
+
+        self.process.wait()
+        with self._lock:
+            self._closed = True
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for future in pending:
+            future.set_exception(CollectionError("The pytkdocs subprocess exited before responding"))
+
+
+class WorkerPool:
+    """A pool of worker subprocesses, accepting concurrent requests.
+
+    Workers are started on demand: a request is sent to the worker with the fewest pending requests,
+    and a new worker is started when all of them are busy, up to `max_workers`.
+
+    Workers that answered `max_requests` requests, or whose peak resident set size exceeds `max_rss`,
+    are recycled: they stop receiving requests and exit once they answered the pending ones,
+    and new workers are started with the same command in their place.
+    """
+
+    def __init__(
+        self,
+        cmd: Sequence[str],
+        env: Optional[Mapping[str, str]] = None,
+        max_workers: int = 1,
+        max_requests: int = 0,
+        max_rss: int = 0,
+    ) -> None:
+        """Initialize the pool.
+
+        Parameters:
+            cmd: The command running the [worker][mkdocstrings_handlers.python.worker].
+            env: The environment variables of the subprocesses.
+            max_workers: The maximum number of subprocesses to start.
+            max_requests: The number of requests after which a subprocess is recycled, or 0 for no limit.
+            max_rss: The peak resident set size (in bytes) after which a subprocess is recycled, or 0 for no limit.
+        """
+        self.cmd = cmd
+        """The command running the worker."""
+        self.env = env
+        """The environment variables of the subprocesses."""
+        self.max_workers = max(max_workers, 1)
+        """The maximum number of subprocesses to start."""
+        self.max_requests = max_requests
+        """The number of requests after which a subprocess is recycled."""
+        self.max_rss = max_rss
+        """The peak resident set size (in bytes) after which a subprocess is recycled."""
+        self.workers: list[WorkerProcess] = []
+        """The running workers."""
+        self._retired: list[WorkerProcess] = []
+        self._lock = threading.Lock()
+
+    def submit(self, request: str) -> "Future[str]":
+        """Send a request to the least busy worker.
+
+        This method can be called from multiple threads.
+
+        Parameters:
+            request: The JSON request, on a single line.
+
+        Returns:
+            A future resolving to the JSON response.
+        """
+        with self._lock:
+            for exhausted in filter(self._exhausted, self.workers):
+                logger.debug(f"Recycling pytkdocs subprocess {exhausted.process.pid}")
+                exhausted.retire()
+                self._retired.append(exhausted)
+            self._retired = [retired for retired in self._retired if retired.process.poll() is None]
+            self.workers = [worker for worker in self.workers if worker.running]
+            worker = min(self.workers, key=lambda worker: worker.pending, default=None)
+            if worker is None or (worker.pending and len(self.workers) < self.max_workers):
+                logger.debug("Starting a new pytkdocs subprocess")
+                worker = WorkerProcess(self.cmd, self.env)
+                self.workers.append(worker)
+            return worker.submit(request)
+
+    def _exhausted(self, worker: WorkerProcess) -> bool:
+        return bool(
+            (self.max_requests and worker.requests >= self.max_requests)
+            or (self.max_rss and worker.rss > self.max_rss),
+        )
+
+    def request(self, request: str) -> str:
+        """Send a request to the least busy worker, and wait for its response.
+
+        Parameters:
+            request: The JSON request, on a single line.
+
+        Returns:
+            The JSON response.
+        """
+        return self.submit(request).result()
+
+    def close(self) -> None:
+        """Terminate all the workers."""
+        with self._lock:
+            workers, self.workers, self._retired = self.workers + self._retired, [], []
+        for worker in workers:
+            worker.close()
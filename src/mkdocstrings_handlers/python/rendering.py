@@ -1,8 +1,13 @@
 """This module implements rendering utilities."""
 
+import re
 import sys
-from typing import Any, Callable
+from collections.abc import Collection, Iterator, Mapping, Sequence
+from functools import cache
+from typing import Any, Callable, Optional, Union
 
+from jinja2 import pass_context
+from jinja2.runtime import Context
 from markupsafe import Markup
 from mkdocstrings import CollectorItem, get_logger
 
@@ -22,6 +27,120 @@ def do_brief_xref(path: str) -> Markup:
     return Markup("<autoref identifier={path} optional hover>{brief}</autoref>").format(path=path, brief=brief)
 
 
+def do_brief_text(path: str) -> Markup:
+    """Filter to render the brief text of a path, with the full identifier as hover text, without cross-reference.
+
+    This filter replaces [`do_brief_xref`][mkdocstrings_handlers.python.rendering.do_brief_xref] in draft mode.
+
+    Arguments:
+        path: The path to shorten and render.
+
+    Returns:
+        A span containing the brief text, and the full identifier on hover.
+    """
+    brief = path.rsplit(".", 1)[-1]
+    return Markup('<span title="{path}">{brief}</span>').format(path=path, brief=brief)
+
+
+def iter_source_snippets(obj: CollectorItem, *, recursive: bool = True) -> Iterator[tuple[str, int]]:
+    """Yield the source code snippets that the templates highlight for an object.
+
+    Only classes, functions and methods have their source code rendered.
+
+    Arguments:
+        obj: The collected object, with its category lists rebuilt.
+        recursive: Whether to also yield the snippets of the object's children, recursively.
+
+    Yields:
+        Tuples of (source code, starting line number).
+    """
+    if obj["category"] in {"class", "function", "method"} and obj.get("source"):
+        yield obj["source"]["code"], obj["source"]["line_start"]
+    if recursive:
+        for child in obj["children"]:
+            yield from iter_source_snippets(child)
+
+
+def highlight_source_snippets(
+    highlight: Callable[..., Markup],
+    snippets: list[tuple[str, int]],
+) -> list[Markup]:
+    """Highlight source code snippets the same way the templates do.
+
+    This function is picklable, so that it can be submitted to a pool of processes.
+
+    Arguments:
+        highlight: The `highlight` filter of the Jinja environment.
+        snippets: Tuples of (source code, starting line number).
+
+    Returns:
+        The highlighted snippets, in the same order.
+    """
+    return [highlight(code, language="python", linestart=line_start, linenums=False) for code, line_start in snippets]
+
+
+PREHIGHLIGHTED_VAR = "prehighlighted_sources"
+"""The name of the template variable holding the source code snippets that were already highlighted."""
+
+
+def prehighlighted(highlight: Callable[..., Markup]) -> Callable[..., Markup]:
+    """Wrap a `highlight` filter to return source code snippets that were already highlighted.
+
+    The already highlighted snippets are read from the rendering context
+    (in the [`PREHIGHLIGHTED_VAR`][mkdocstrings_handlers.python.rendering.PREHIGHLIGHTED_VAR] variable),
+    so that the filter can be installed once in the shared Jinja environment, and used by concurrent renderings.
+
+    Arguments:
+        highlight: The `highlight` filter of the Jinja environment.
+
+    Returns:
+        A new `highlight` filter. The wrapped filter is available in its `__wrapped__` attribute.
+    """
+
+    @pass_context
+    def do_highlight(context: Context, src: str, language: Optional[str] = None, **kwargs: Any) -> Markup:
+        highlighted: Optional[Mapping[tuple[str, int], Markup]] = context.get(PREHIGHLIGHTED_VAR)
+        if (
+            highlighted
+            and language == "python"
+            and kwargs.keys() == {"linestart", "linenums"}
+            and kwargs["linenums"] is False
+        ):
+            try:
+                return highlighted[src, kwargs["linestart"]]
+            except KeyError:
+                pass
+        return highlight(src, language, **kwargs)
+
+    do_highlight.__wrapped__ = highlight  # type: ignore[attr-defined]
+    return do_highlight
+
+
+def draft_highlighted(highlight: Callable[..., Markup]) -> Callable[..., Markup]:
+    """Wrap a `highlight` filter to render inline code without highlighting it, in draft mode.
+
+    Inline code is used in the headings of every object: it is rendered as plain text in a `code` element,
+    with the same classes as the highlighted one. Code blocks are still highlighted.
+
+    Arguments:
+        highlight: The `highlight` filter of the Jinja environment.
+
+    Returns:
+        A new `highlight` filter. The wrapped filter is available in its `__wrapped__` attribute.
+    """
+
+    def do_highlight(src: str, language: Optional[str] = None, *, inline: bool = False, **kwargs: Any) -> Markup:
+        if not inline:
+            return highlight(src, language, inline=inline, **kwargs)
+        if isinstance(src, Markup):
+            src = src.unescape()
+        code = " ".join(src.split())
+        return Markup('<code class="highlight language-{language}">{code}</code>').format(language=language, code=code)
+
+    do_highlight.__wrapped__ = highlight  # type: ignore[attr-defined]
+    return do_highlight
+
+
 def sort_object(obj: CollectorItem, sort_function: Callable[[CollectorItem], Any]) -> None:
     """Sort the collected object's children.
 
@@ -69,6 +188,113 @@ def sort_key_source(item: CollectorItem) -> Any:
     return item.get("source", {}).get("line_start", -1)
 
 
+def iter_tree(obj: CollectorItem) -> Iterator[tuple[str, CollectorItem]]:
+    """Iterate on an object and its children, recursively.
+
+    Arguments:
+        obj: The collected object, with its category lists rebuilt.
+
+    Yields:
+        Tuples of (object path, object).
+    """
+    yield obj["path"], obj
+    for child in obj["children"]:
+        yield from iter_tree(child)
+
+
+def release_rendered(obj: CollectorItem, paths: Optional[Collection[str]] = None) -> None:
+    """Release the heaviest fields of a rendered object and its children.
+
+    The source code and raw docstring of each object are not needed anymore once the object is rendered:
+    they are emptied, so that they can be garbage-collected even if the object itself is still referenced.
+
+    Arguments:
+        obj: The rendered object, with its category lists rebuilt.
+        paths: If given, only the objects with these paths are released.
+    """
+    for path, node in iter_tree(obj):
+        if paths is not None and path not in paths:
+            continue
+        if node.get("source"):
+            node["source"] = {}
+        if node.get("docstring"):
+            node["docstring"] = ""
+
+
+def compile_filters(filters: Optional[Sequence[str]]) -> tuple[tuple[bool, re.Pattern], ...]:
+    """Compile the regular expressions of the `filters` option.
+
+    Arguments:
+        filters: A list of filters. A filter starting with `!` excludes matching names.
+
+    Returns:
+        Tuples of (exclusion, compiled regular expression).
+    """
+    return _compile_filters(tuple(filters or ()))
+
+
+@cache
+def _compile_filters(filters: tuple[str, ...]) -> tuple[tuple[bool, re.Pattern], ...]:
+    return tuple((filtr.startswith("!"), re.compile(filtr.lstrip("!"))) for filtr in filters)
+
+
+def filter_name_out(name: str, filters: Sequence[tuple[bool, re.Pattern]]) -> bool:
+    """Tell whether a name is filtered out, the same way `pytkdocs` does it.
+
+    Each matching filter overrides the decision of the previous ones.
+
+    Arguments:
+        name: The name to filter.
+        filters: The compiled filters, as returned by
+            [`compile_filters()`][mkdocstrings_handlers.python.rendering.compile_filters].
+
+    Returns:
+        True if the name is filtered out, False otherwise.
+    """
+    keep = True
+    for exclude, regex in filters:
+        if regex.search(name):
+            keep = not exclude
+    return not keep
+
+
+def filter_tree(
+    obj: CollectorItem,
+    filters: Sequence[tuple[bool, re.Pattern]],
+    *,
+    members: Union[Collection[str], bool, None] = None,
+) -> CollectorItem:
+    """Select the members of a collected object, recursively, the same way `pytkdocs` does it.
+
+    Explicit `members` are applied on the root object only, and take precedence over `filters`.
+    Filters are applied recursively on the rest of the tree.
+
+    The original tree is not modified: selected objects are shallow copies,
+    with their own children and category lists.
+
+    Arguments:
+        obj: The collected object, with its category lists rebuilt.
+        filters: The compiled filters, as returned by
+            [`compile_filters()`][mkdocstrings_handlers.python.rendering.compile_filters].
+        members: `False` to select no members, or an explicit list of members to select.
+
+    Returns:
+        A copy of the object, with its members selected.
+    """
+    if members is False:
+        selected = []
+    elif members and members is not True:
+        selected = [child for child in obj["children"] if child["name"] in members]
+    else:
+        selected = [child for child in obj["children"] if not filter_name_out(child["name"], filters)]
+
+    views = {id(child): filter_tree(child, filters) for child in selected}
+    view = {**obj, "children": list(views.values())}
+    for category in ("attributes", "classes", "functions", "methods", "modules"):
+        view[category] = [views[id(child)] for child in obj[category] if id(child) in views]
+    return view
+
+
 def rebuild_category_lists(obj: dict) -> None:
     """Recursively rebuild the category lists of a collected object.
 
@@ -0,0 +1,123 @@
+"""This module implements the scheduling of collection jobs, based on their cost in previous builds.
+
+When many objects are collected concurrently, the most expensive ones are sent first,
+so that workers do not sit idle while a single large package is being collected at the end.
+Cheap objects are grouped into batches, collected with a single request each.
+"""
+
+import json
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Optional
+
+from mkdocstrings import get_logger
+
+from mkdocstrings_handlers.python.cache import locked, read_cache, write_cache
+
+logger = get_logger(__name__)
+
+SECONDS_PER_BYTE = 1e-8
+"""The estimated time it takes to decode one byte of a JSON response."""
+
+SMALL_JOB_COST = 0.05
+"""The cost (in seconds) under which a job is batched with other small jobs."""
+
+BATCH_COST = 0.25
+"""The maximum total cost (in seconds) of a batch of small jobs."""
+
+
+class CollectionCosts:
+    """The collection durations and response sizes of objects, persisted between builds."""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        """Initialize the costs, loading them from `path` if it exists.
+
+        Parameters:
+            path: The file in which costs are persisted.
+        """
+        self.path = path
+        """The file in which costs are persisted."""
+        self.costs: dict[str, tuple[float, int]] = self._load() if path else {}
+        """The collection duration (in seconds) and response size (in bytes) of each identifier."""
+        self._recorded: dict[str, tuple[float, int]] = {}
+
+    def _load(self) -> dict[str, tuple[float, int]]:
+        if self.path and (data := read_cache(self.path)):
+            try:
+                return {identifier: (duration, size) for identifier, (duration, size) in json.loads(data).items()}
+            except ValueError:
+                logger.debug(f"Ignoring invalid collection costs in {self.path}")
+        return {}
+
+    def record(self, identifier: str, duration: float, size: int) -> None:
+        """Record the cost of collecting an object.
+
+        Arguments:
+            identifier: The collected identifier.
+            duration: The time (in seconds) it took to collect the object.
+            size: The size (in bytes) of the response.
+        """
+        self.costs[identifier] = self._recorded[identifier] = (duration, size)
+
+    def estimate(self, identifier: str) -> Optional[float]:
+        """Estimate the cost of collecting an object.
+
+        Arguments:
+            identifier: The identifier to collect.
+
+        Returns:
+            The estimated cost in seconds, or `None` if the object was never collected.
+        """
+        if identifier not in self.costs:
+            return None
+        duration, size = self.costs[identifier]
+        return duration + size * SECONDS_PER_BYTE
+
+    def save(self) -> None:
+        """Persist the costs, if a path was given.
+
+        The recorded costs are merged into the persisted ones, under a lock,
+        so that builds sharing the same cache directory do not lose each other's records.
+        """
+        if self.path and self._recorded:
+            with locked(self.path):
+                costs = {**self._load(), **self._recorded}
+                write_cache(self.path, json.dumps(costs, sort_keys=True).encode())
+            self._recorded.clear()
+
+
+def schedule(identifiers: Iterable[str], costs: CollectionCosts) -> list[list[str]]:
+    """Order and group identifiers to minimize the total time it takes to collect them concurrently.
+
+    Identifiers are sorted by decreasing estimated cost (longest processing time first).
+    Identifiers that were never collected are assumed to be as expensive as the most expensive known one,
+    and keep their relative order. Identifiers that are cheap to collect are grouped into batches.
+
+    Arguments:
+        identifiers: The identifiers to collect.
+        costs: The costs from previous collections.
+
+    Returns:
+        Batches of identifiers, most expensive first.
+    """
+    estimates: Mapping[str, Optional[float]] = {identifier: costs.estimate(identifier) for identifier in identifiers}
+    unknown_cost = max((cost for cost in estimates.values() if cost is not None), default=0.0)
+
+    jobs: list[tuple[float, list[str]]] = []
+    batch: list[str] = []
+    batch_cost = 0.0
+    for identifier, cost in estimates.items():
+        if cost is None or cost >= SMALL_JOB_COST:
+            jobs.append((unknown_cost if cost is None else cost, [identifier]))
+            continue
+        if batch and batch_cost + cost > BATCH_COST:
+            jobs.append((batch_cost, batch))
+            batch, batch_cost = [], 0.0
+        batch.append(identifier)
+        batch_cost += cost
+    if batch:
+        jobs.append((batch_cost, batch))
+
+    # Sorting is stable: jobs with the same cost keep their order.
+    jobs.sort(key=lambda job: job[0], reverse=True)
+    return [job for _, job in jobs]
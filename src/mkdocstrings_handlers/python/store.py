@@ -0,0 +1,528 @@
+"""This module implements the single-file store of collected objects.
+
+The store is a file opened with `mmap`, made of records, followed by an index and a trailer:
+
+```
+<magic>
+<sha256><record>...
+<index>
+<index offset><index length><index sha256><magic>
+```
+
+Each object of a collected tree is written in its own record, with the paths of its children instead of the children
+themselves. An entry record lists the records of the objects of a tree, and the files and digests used to validate it.
+The index maps collection keys to entry records, and paths of objects within reusable trees to their entry.
+Looking an object up only reads and decodes the index, the entry record, and the records of the requested objects.
+
+Records are only appended, under an inter-process lock, and the index is written again after them:
+readers that opened the store earlier still see a consistent index. When too much space is taken
+by superseded records and indexes, or when the store exceeds its size budget, it is compacted into a new file,
+dropping the least recently used entries first.
+
+The last use time of entries that were only read is not written to the store, which would require
+appending a new index: it is merged into a small side file (`<store>.used.store` next to the store),
+and only moved into the index when the store is compacted.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections.abc import Iterable, Iterator, Mapping
+from pathlib import Path
+from pkgutil import iter_modules
+from typing import IO, Any, BinaryIO, Optional, Union
+
+from mkdocstrings import get_logger
+
+from mkdocstrings_handlers.python.cache import CacheStats, content_hash, locked, read_cache, write_cache
+
+logger = get_logger(__name__)
+
+STORE_MAGIC = b"mkdplst2"
+"""The bytes starting and ending a store file."""
+
+_DIGEST_SIZE = hashlib.sha256().digest_size
+_TRAILER = struct.Struct(f"<QQ{_DIGEST_SIZE}s{len(STORE_MAGIC)}s")
+
+_Location = tuple[int, int]
+
+# The index maps entry keys to [record offset, record length, total size with objects, last use time].
+
+
+def _empty_index() -> dict[str, dict[str, Any]]:
+    return {"entries": {}, "subtrees": {}, "resolved": {}}
+
+
+class CollectionCache:
+    """Collection responses persisted in a single file, valid as long as their source files do not change.
+
+    Each entry records the digest of the files the collected objects were found in,
+    of the modules the collected identifier goes through, and of the list of modules of each collected package.
+    An entry whose files were modified, moved or deleted, or whose packages gained or lost modules, is ignored.
+    New entries are kept in memory until they are written with
+    [`flush`][mkdocstrings_handlers.python.store.CollectionCache.flush].
+    """
+
+    def __init__(self, path: Path, stats: Optional[CacheStats] = None) -> None:
+        """Initialize the cache, opening the store if it exists.
+
+        Parameters:
+            path: The store file.
+            stats: The statistics to update.
+        """
+        self.path = path
+        """The store file."""
+        self.stats = stats or CacheStats()
+        """The statistics of the cache."""
+        self._digests: dict[str, Optional[str]] = {}
+        self._lock = threading.RLock()
+        self._file: Optional[BinaryIO] = None
+        self._map: Optional[mmap.mmap] = None
+        self._index = _empty_index()
+        self._index_size = 0
+        self._used_path = path.with_name(f"{path.stem}.used{path.suffix}")
+        self._pending: dict[str, tuple[dict[str, Any], dict[str, bytes]]] = {}
+        self._pending_resolved: dict[str, bytes] = {}
+        self._used: dict[str, float] = {}
+        self._open()
+
+    def file_digest(self, path: str) -> Optional[str]:
+        """Hash the contents of a file, or the names of the modules of a package directory, once per process.
+
+        Arguments:
+            path: The path of the file or package directory.
+
+        Returns:
+            The digest of the file contents or module names, or `None` if it cannot be read.
+        """
+        if path not in self._digests:
+            try:
+                if os.path.isdir(path):
+                    names = sorted(f"{name}/" if is_package else name for _, name, is_package in iter_modules([path]))
+                    self._digests[path] = content_hash("dir", *names)
+                else:
+                    self._digests[path] = content_hash(Path(path).read_bytes())
+            except OSError:
+                self._digests[path] = None
+        return self._digests[path]
+
+    def get(self, prefix: str, identifier: str, *, subtree: bool = False) -> Optional[dict[str, Any]]:
+        """Return a response if its source files did not change.
+
+        Arguments:
+            prefix: The collection options (and versions) that the response depends on.
+            identifier: The collected identifier.
+            subtree: Whether the object can be found within a tree collected for another identifier
+                with the same prefix. Only the requested object and its descendants are then decoded.
+
+        Returns:
+            The cached response, or `None`.
+        """
+        key = content_hash(prefix, identifier)
+        with self._lock:
+            if key in self._pending or key in self._index["entries"]:
+                entry_key, root = key, None
+            elif subtree and key in self._index["subtrees"]:
+                entry_key, root = self._index["subtrees"][key], identifier
+            else:
+                self.stats.misses += 1
+                return None
+            response = self._load(entry_key, root)
+            if response is None:
+                self.stats.misses += 1
+                return None
+            self.stats.hits += 1
+            self._used[entry_key] = time.time()
+            return response
+
+    def set(
+        self,
+        prefix: str,
+        identifier: str,
+        obj: dict[str, Any],
+        loading_errors: list[str],
+        parsing_errors: Mapping[str, list[str]],
+        *,
+        reusable: bool = True,
+        module_files: Iterable[str] = (),
+    ) -> None:
+        """Store a collected object.
+
+        Objects with unreadable source files are not stored.
+
+        Arguments:
+            prefix: The collection options (and versions) that the response depends on.
+            identifier: The collected identifier.
+            obj: The collected object, as serialized by `pytkdocs` (before its category lists are rebuilt).
+            loading_errors: The loading errors of the collection.
+            parsing_errors: The parsing errors of the collection.
+            reusable: Whether the objects of the tree can be returned for other identifiers
+                (see [`get`][mkdocstrings_handlers.python.store.CollectionCache.get]).
+            module_files: The files of the modules the identifier goes through,
+                see [`module_files`][mkdocstrings_handlers.python.worker.module_files].
+        """
+        nodes = dict(_iter_nodes(obj))
+        files = {node["file_path"] for node in nodes.values() if node.get("file_path")}
+        files.update(module_files)
+        # Adding or removing a module from a package changes its members.
+        files.update(
+            os.path.dirname(node["file_path"])
+            for node in nodes.values()
+            if node.get("category") == "module" and os.path.basename(node.get("file_path") or "") == "__init__.py"
+        )
+        digests = {path: self.file_digest(path) for path in files}
+        if None in digests.values():
+            return
+        self._add(
+            {
+                "prefix": prefix,
+                "identifier": identifier,
+                "reusable": reusable,
+                "files": digests,
+                "loading_errors": loading_errors,
+                "parsing_errors": {path: errors for path, errors in parsing_errors.items() if path in nodes},
+                "root": obj["path"],
+            },
+            nodes,
+        )
+
+    def get_resolved(self, prefix: str, identifier: str) -> Optional[dict[str, Optional[str]]]:
+        """Return a resolved identifier if its module file, and the modules it goes through, did not change.
+
+        Arguments:
+            prefix: The versions that the resolution depends on.
+            identifier: The resolved identifier.
+
+        Returns:
+            The canonical path and module file path of the identifier, or `None`.
+        """
+        key = content_hash(prefix, identifier)
+        with self._lock:
+            if (data := self._pending_resolved.get(key)) is None:
+                if (location := self._index["resolved"].get(key)) is None:
+                    return None
+                data = self._read(location)
+            if data is None:
+                return None
+            resolved = json.loads(data)
+        files = resolved.pop("files", None)
+        if not files or any(self.file_digest(path) != digest for path, digest in files.items()):
+            return None
+        return resolved
+
+    def set_resolved(
+        self,
+        prefix: str,
+        identifier: str,
+        resolved: Mapping[str, Optional[str]],
+        module_files: Iterable[str] = (),
+    ) -> None:
+        """Store a resolved identifier.
+
+        Identifiers without a readable module file are not stored.
+
+        Arguments:
+            prefix: The versions that the resolution depends on.
+            identifier: The resolved identifier.
+            resolved: The canonical path and module file path of the identifier.
+            module_files: The files of the modules the identifier goes through,
+                see [`module_files`][mkdocstrings_handlers.python.worker.module_files].
+                A module re-exporting the identifier can change where it points to.
+        """
+        if not resolved["file_path"]:
+            return
+        digests = {path: self.file_digest(path) for path in {resolved["file_path"], *module_files}}
+        if None in digests.values():
+            return
+        data = json.dumps({**resolved, "files": digests}).encode()
+        with self._lock:
+            self._pending_resolved[content_hash(prefix, identifier)] = data
+
+    def iter_entries(self) -> Iterator[tuple[str, bytes]]:
+        """Iterate on the stored entries, with their objects, in a self-contained format.
+
+        Yields:
+            Tuples of (entry name, JSON entry), see [`put_entry`][mkdocstrings_handlers.python.store.CollectionCache.put_entry].
+        """
+        with self._lock:
+            keys = list(self._index["entries"])
+        for key in keys:
+            with self._lock:
+                meta = self._entry(key)
+                response = self._load(key, None, validate=False)
+            if meta is None or response is None:
+                continue
+            entry = {
+                "prefix": meta["prefix"],
+                "identifier": meta["identifier"],
+                "reusable": meta["reusable"],
+                "files": meta["files"],
+                "response": response,
+            }
+            yield f"objects/{key}.json", json.dumps(entry).encode()
+
+    def put_entry(self, data: bytes) -> None:
+        """Store an entry, as yielded by [`iter_entries`][mkdocstrings_handlers.python.store.CollectionCache.iter_entries].
+
+        The file digests of the entry are kept, so that the entry is ignored if the local files are different.
+
+        Arguments:
+            data: The JSON entry.
+        """
+        entry = json.loads(data)
+        response = entry["response"]
+        obj = response["objects"][0]
+        self._add(
+            {
+                "prefix": entry["prefix"],
+                "identifier": entry["identifier"],
+                "reusable": entry["reusable"],
+                "files": entry["files"],
+                "loading_errors": response["loading_errors"],
+                "parsing_errors": response["parsing_errors"],
+                "root": obj["path"],
+            },
+            dict(_iter_nodes(obj)),
+        )
+
+    def flush(self, max_size: int = 0) -> None:
+        """Write the new entries to the store, and compact it if needed.
+
+        Arguments:
+            max_size: The maximum size of the store in bytes, or 0 for no limit.
+                The least recently used entries are dropped to fit in this size.
+        """
+        with self._lock:
+            if not (self._pending or self._pending_resolved or self._used or max_size):
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with locked(self.path):
+                    # Other builds may have written to the store since we opened it.
+                    self._open()
+                    if self._pending or self._pending_resolved:
+                        self._append()
+                    if self._used:
+                        self._save_used()
+                    live_size = self._index_size + sum(entry[2] for entry in self._index["entries"].values())
+                    file_size = self._map.size() if self._map else 0
+                    if (max_size and file_size > max_size) or file_size > 2 * live_size + 1024 * 1024:
+                        self._compact(max_size)
+            except OSError as error:
+                logger.debug(f"Could not write the collection store {self.path}: {error}")
+
+    def close(self) -> None:
+        """Close the store file."""
+        with self._lock:
+            self._close()
+
+    def _add(self, meta: dict[str, Any], nodes: Mapping[str, dict[str, Any]]) -> None:
+        records = {
+            path: json.dumps({**node, "children": list(node["children"])}).encode() for path, node in nodes.items()
+        }
+        with self._lock:
+            self._pending[content_hash(meta["prefix"], meta["identifier"])] = (meta, records)
+        self.stats.bytes += sum(len(record) for record in records.values())
+
+    def _load(self, entry_key: str, root: Optional[str], *, validate: bool = True) -> Optional[dict[str, Any]]:
+        # Decode the objects of an entry, starting at `root` (or at the root of the entry).
+        if (meta := self._entry(entry_key)) is None:
+            return None
+        if validate and any(self.file_digest(path) != digest for path, digest in meta["files"].items()):
+            return None
+        size = 0
+
+        def load_node(path: str) -> Optional[dict[str, Any]]:
+            nonlocal size
+            if (data := self._node(entry_key, meta, path)) is None:
+                return None
+            size += len(data)
+            node = json.loads(data)
+            children = {}
+            for child_path in node["children"]:
+                if (child := load_node(child_path)) is None:
+                    return None
+                children[child_path] = child
+            node["children"] = children
+            return node
+
+        if (obj := load_node(root or meta["root"])) is None:
+            return None
+        paths = {path for path, _ in _iter_nodes(obj)}
+        return {
+            "loading_errors": meta["loading_errors"] if root is None else [],
+            "parsing_errors": {path: errors for path, errors in meta["parsing_errors"].items() if path in paths},
+            "objects": [obj],
+            "size": size,
+        }
+
+    def _entry(self, key: str) -> Optional[dict[str, Any]]:
+        if key in self._pending:
+            return self._pending[key][0]
+        if (data := self._read(self._index["entries"][key][:2])) is None:
+            return None
+        return json.loads(data)
+
+    def _node(self, key: str, meta: Mapping[str, Any], path: str) -> Optional[bytes]:
+        if key in self._pending:
+            return self._pending[key][1].get(path)
+        if (location := meta["nodes"].get(path)) is None:
+            return None
+        return self._read(location)
+
+    def _read(self, location: Union[_Location, list[int]]) -> Optional[bytes]:
+        if self._map is None:
+            return None
+        offset, length = location
+        record = self._map[offset : offset + length]
+        digest, data = record[:_DIGEST_SIZE], record[_DIGEST_SIZE:]
+        if hashlib.sha256(data).digest() != digest:
+            logger.debug(f"Ignoring corrupted record in {self.path}")
+            return None
+        return data
+
+    def _open(self) -> None:
+        self._close()
+        self._index = _empty_index()
+        self._index_size = 0
+        try:
+            self._file = open(self.path, "rb")  # noqa: SIM115
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # Missing or empty file.
+            self._close()
+            return
+        if (index := self._read_index()) is None:
+            logger.debug(f"Discarding corrupted collection store {self.path}")
+            self._close()
+            return
+        self._index = index
+
+    def _close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _read_index(self) -> Optional[dict[str, Any]]:
+        data = self._map
+        if data is None or len(data) < len(STORE_MAGIC) + _TRAILER.size or data[: len(STORE_MAGIC)] != STORE_MAGIC:
+            return None
+        offset, length, digest, magic = _TRAILER.unpack(data[-_TRAILER.size :])
+        index = data[offset : offset + length]
+        if magic != STORE_MAGIC or hashlib.sha256(index).digest() != digest:
+            return None
+        self._index_size = length + _TRAILER.size
+        return json.loads(index)
+
+    def _read_used(self) -> dict[str, float]:
+        if (data := read_cache(self._used_path)) is None:
+            return {}
+        try:
+            return json.loads(data)
+        except ValueError:
+            return {}
+
+    def _save_used(self) -> None:
+        # Merge the last use times into the side file, rather than appending a new index to the store.
+        used = self._read_used()
+        for key, time_used in self._used.items():
+            used[key] = max(used.get(key, 0.0), time_used)
+        write_cache(self._used_path, json.dumps(used).encode())
+        self._used.clear()
+
+    def _append(self) -> None:
+        index = self._index
+        now = time.time()
+        mode = "r+b" if self._map is not None else "wb"
+        with open(self.path, mode) as store:
+            if self._map is None:
+                store.write(STORE_MAGIC)
+            else:
+                # Overwrite the trailer only: previous records and index stay readable.
+                store.seek(-_TRAILER.size, os.SEEK_END)
+            for key, (meta, records) in self._pending.items():
+                index["entries"][key] = [*_write_entry(store, meta, records), now]
+                if meta["reusable"]:
+                    for path in records:
+                        index["subtrees"][content_hash(meta["prefix"], path)] = key
+            for key, data in self._pending_resolved.items():
+                index["resolved"][key] = _write_record(store, data)
+            _write_index(store, index)
+        self._pending.clear()
+        self._pending_resolved.clear()
+        self._open()
+
+    def _compact(self, max_size: int) -> None:
+        # Copy the most recently used entries into a new store, within the size budget.
+        used = self._read_used()
+        for key, entry in self._index["entries"].items():
+            entry[3] = max(entry[3], used.get(key, 0.0))
+        entries = sorted(self._index["entries"].items(), key=lambda item: item[1][3], reverse=True)
+        index = _empty_index()
+        size = 0
+        fd, temp_name = tempfile.mkstemp(prefix=f"{self.path.name}.", suffix=".tmp", dir=self.path.parent)
+        try:
+            with os.fdopen(fd, "wb") as store:
+                store.write(STORE_MAGIC)
+                for key, (_, _, entry_size, used) in entries:
+                    if (max_size and size + entry_size > max_size) or (meta := self._entry(key)) is None:
+                        self.stats.evictions += 1
+                        continue
+                    records = {path: self._read(location) for path, location in meta.pop("nodes").items()}
+                    if None in records.values():
+                        continue
+                    index["entries"][key] = [*_write_entry(store, meta, records), used]  # type: ignore[arg-type]
+                    if meta["reusable"]:
+                        for path in records:
+                            index["subtrees"][content_hash(meta["prefix"], path)] = key
+                    size += entry_size
+                for key, location in self._index["resolved"].items():
+                    if (data := self._read(location)) is not None:
+                        index["resolved"][key] = _write_record(store, data)
+                _write_index(store, index)
+            self._close()
+            os.replace(temp_name, self.path)
+            # The last use times are now in the index.
+            self._used_path.unlink(missing_ok=True)
+        except OSError as error:
+            logger.debug(f"Could not compact the collection store {self.path}: {error}")
+            Path(temp_name).unlink(missing_ok=True)
+        self._open()
+
+
+def _iter_nodes(obj: dict[str, Any]) -> Iterator[tuple[str, dict[str, Any]]]:
+    # Iterate on serialized objects, whose children are mappings of paths to objects.
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        yield node["path"], node
+        stack.extend(node["children"].values())
+
+
+def _write_record(store: IO[bytes], data: bytes) -> list[int]:
+    offset = store.tell()
+    store.write(hashlib.sha256(data).digest())
+    store.write(data)
+    return [offset, _DIGEST_SIZE + len(data)]
+
+
+def _write_entry(store: IO[bytes], meta: Mapping[str, Any], records: Mapping[str, bytes]) -> list[int]:
+    # Returns the location of the entry record, and the total size of the entry.
+    nodes = {path: _write_record(store, record) for path, record in records.items()}
+    location = _write_record(store, json.dumps({**meta, "nodes": nodes}).encode())
+    return [*location, location[1] + sum(length for _, length in nodes.values())]
+
+
+def _write_index(store: IO[bytes], index: Mapping[str, Any]) -> None:
+    data = json.dumps(index).encode()
+    offset = store.tell()
+    store.write(data)
+    store.write(_TRAILER.pack(offset, len(data), hashlib.sha256(data).digest(), STORE_MAGIC))
+    store.truncate()
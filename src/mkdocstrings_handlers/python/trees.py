@@ -0,0 +1,250 @@
+"""This module implements the in-memory index of the object trees collected during a build, and their compaction."""
+
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator, Mapping
+from itertools import accumulate, count
+from typing import Any, Optional
+
+from mkdocstrings import CollectorItem, get_logger
+
+from mkdocstrings_handlers.python.cache import CacheStats
+from mkdocstrings_handlers.python.rendering import iter_tree
+
+logger = get_logger(__name__)
+
+OBJECT_LISTS = frozenset(("children", "attributes", "methods", "functions", "modules", "classes"))
+"""The keys of collected objects holding lists of other objects."""
+
+
+class SourceSlice(Mapping[str, Any]):
+    """The source of a collected object, as a slice of a source buffer shared with its parents.
+
+    It behaves like the `source` dictionary returned by `pytkdocs`, with `code` and `line_start` keys,
+    but its code is only extracted from the buffer when it is accessed.
+    """
+
+    __slots__ = ("_buffer", "_start", "_stop", "line_start")
+
+    def __init__(self, buffer: str, start: int, stop: int, line_start: int) -> None:
+        """Initialize the slice.
+
+        Parameters:
+            buffer: The source code of the outermost object of the file.
+            start: The offset of the code in the buffer.
+            stop: The end offset of the code in the buffer.
+            line_start: The line number of the first line of the code.
+        """
+        self._buffer = buffer
+        self._start = start
+        self._stop = stop
+        self.line_start = line_start
+        """The line number of the first line of the code."""
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "code":
+            return self._buffer[self._start : self._stop]
+        if key == "line_start":
+            return self.line_start
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(("code", "line_start"))
+
+    def __len__(self) -> int:
+        return 2
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return SourceSlice, (self._buffer, self._start, self._stop, self.line_start)
+
+
+def compact_tree(obj: CollectorItem) -> None:
+    """Reduce the memory used by a collected object and its children, in place.
+
+    Equal strings (paths, file paths, annotations, etc.) are replaced by a single instance.
+    The source code of each object is replaced by a [`SourceSlice`][mkdocstrings_handlers.python.trees.SourceSlice]
+    of the source code of the outermost object of the same file (usually its module), when it is contained in it.
+
+    Arguments:
+        obj: The collected object, with its category lists rebuilt.
+    """
+    strings: dict[str, str] = {}
+    # File path -> (buffer, line number of the buffer, offsets of the lines in the buffer).
+    buffers: dict[str, tuple[str, int, list[int]]] = {}
+    for _, node in iter_tree(obj):
+        for key, value in node.items():
+            if key not in OBJECT_LISTS and key != "source":
+                node[key] = _intern(value, strings)
+        if (source := node.get("source")) and isinstance(source, dict):
+            node["source"] = _slice_source(source, node.get("file_path", ""), buffers)
+
+
+def _intern(value: Any, strings: dict[str, str]) -> Any:
+    if isinstance(value, str):
+        return strings.setdefault(value, value)
+    if isinstance(value, list):
+        return [_intern(item, strings) for item in value]
+    if isinstance(value, dict):
+        return {key: _intern(item, strings) for key, item in value.items()}
+    return value
+
+
+def _slice_source(source: dict[str, Any], file_path: str, buffers: dict[str, tuple[str, int, list[int]]]) -> Any:
+    code, line_start = source.get("code"), source.get("line_start")
+    if not isinstance(code, str) or not isinstance(line_start, int):
+        return source
+    if file_path in buffers:
+        buffer, buffer_line, offsets = buffers[file_path]
+        index = line_start - buffer_line
+        if 0 <= index < len(offsets) and buffer.startswith(code, offsets[index]):
+            return SourceSlice(buffer, offsets[index], offsets[index] + len(code), line_start)
+    offsets = list(accumulate((len(line) + 1 for line in code.split("\n")), initial=0))
+    buffers[file_path] = (code, line_start, offsets)
+    return SourceSlice(code, 0, len(code), line_start)
+
+
+class CollectedTree(dict):
+    """The root object of a collected tree, which can be weakly referenced once evicted from the index."""
+
+    __slots__ = ("__weakref__", "size")
+
+    size: int
+
+
+class CollectedTrees:
+    """The collected object trees, indexed by object path, and evicted in least recently used order.
+
+    Trees are indexed per collection options (see the `tree_key` of the handler's selection):
+    each object of an indexed tree can be looked up by its path. The size of the trees
+    is measured as the size of the JSON responses they were decoded from.
+    When the total size exceeds `max_size`, the least recently used trees are dropped from the index.
+
+    Evicted trees whose root is a [`CollectedTree`][mkdocstrings_handlers.python.trees.CollectedTree]
+    are only weakly referenced: as long as they are still in use elsewhere (for example being rendered),
+    their objects can be looked up, and their tree is indexed again.
+    Once rendered, trees can be [forgotten][mkdocstrings_handlers.python.trees.CollectedTrees.forget]
+    altogether, to let them be garbage-collected.
+    """
+
+    def __init__(self, max_size: int = 0, stats: Optional[CacheStats] = None) -> None:
+        """Initialize the index.
+
+        Parameters:
+            max_size: The maximum total size of the indexed trees, in bytes, or 0 for no limit.
+            stats: The statistics to update.
+        """
+        self.max_size = max_size
+        """The maximum total size of the indexed trees, in bytes."""
+        self.stats = stats or CacheStats()
+        """The statistics of the index."""
+        self.size = 0
+        """The total size of the indexed trees, in bytes."""
+        self._index: dict[str, dict[str, tuple[int, CollectorItem]]] = {}
+        self._trees: OrderedDict[int, tuple[str, list[str], int, list[CollectorItem]]] = OrderedDict()
+        self._evicted: weakref.WeakValueDictionary[tuple[str, str], CollectedTree] = weakref.WeakValueDictionary()
+        self._ids = count()
+        self._lock = threading.Lock()
+
+    def get(self, tree_key: str, path: str) -> Optional[CollectorItem]:
+        """Look an object up, marking its tree as recently used.
+
+        Arguments:
+            tree_key: The collection options.
+            path: The path of the object.
+
+        Returns:
+            The object, or `None` if it is not indexed.
+        """
+        with self._lock:
+            if (entry := self._index.get(tree_key, {}).get(path)) is None:
+                if (obj := self._revive(tree_key, path)) is None:
+                    self.stats.misses += 1
+                return obj
+            tree_id, obj = entry
+            self._trees.move_to_end(tree_id)
+            self.stats.hits += 1
+            return obj
+
+    def add(self, tree_key: str, roots: Iterable[CollectorItem], size: int) -> None:
+        """Index trees collected together, then evict the least recently used trees if needed.
+
+        Arguments:
+            tree_key: The collection options.
+            roots: The root objects of the trees. Each of their objects is indexed.
+            size: The size of the trees, in bytes.
+        """
+        with self._lock:
+            self._add(tree_key, list(roots), size)
+            self.stats.bytes += size
+
+    def forget(self, paths: Iterable[str]) -> list[CollectorItem]:
+        """Drop the trees containing the given objects, even if they are still in use elsewhere.
+
+        Arguments:
+            paths: The paths of the objects.
+
+        Returns:
+            The root objects of the dropped trees.
+        """
+        paths = set(paths)
+        roots = []
+        with self._lock:
+            tree_ids = {
+                entry[0] for index in self._index.values() for path in paths if (entry := index.get(path)) is not None
+            }
+            for tree_id in tree_ids:
+                roots.extend(self._drop(tree_id)[3])
+            for tree_key, root_path in list(self._evicted.keys()):
+                if not any(path == root_path or path.startswith(f"{root_path}.") for path in paths):
+                    continue
+                if (root := self._evicted.pop((tree_key, root_path), None)) is not None:
+                    roots.append(root)
+        return roots
+
+    def _add(self, tree_key: str, roots: list[CollectorItem], size: int) -> None:
+        tree_id = next(self._ids)
+        index = self._index.setdefault(tree_key, {})
+        paths = []
+        for root in roots:
+            if isinstance(root, CollectedTree):
+                root.size = size
+            for path, obj in iter_tree(root):
+                index[path] = (tree_id, obj)
+                paths.append(path)
+        self._trees[tree_id] = (tree_key, paths, size, roots)
+        self.size += size
+        while self.max_size and self.size > self.max_size and len(self._trees) > 1:
+            self._evict()
+
+    def _revive(self, tree_key: str, path: str) -> Optional[CollectorItem]:
+        parts = path.split(".")
+        for length in range(len(parts), 0, -1):
+            if (root := self._evicted.get((tree_key, ".".join(parts[:length])))) is None:
+                continue
+            for obj_path, obj in iter_tree(root):
+                if obj_path == path:
+                    del self._evicted[tree_key, root["path"]]
+                    self._add(tree_key, [root], root.size)
+                    self.stats.hits += 1
+                    logger.debug(f"Indexed again the evicted tree of {path}, still in use")
+                    return obj
+        return None
+
+    def _drop(self, tree_id: int) -> tuple[str, list[str], int, list[CollectorItem]]:
+        tree_key, paths, size, _ = tree = self._trees.pop(tree_id)
+        index = self._index[tree_key]
+        for path in paths:
+            # Objects could have been indexed again, as part of a more recent tree.
+            if index.get(path, (None,))[0] == tree_id:
+                del index[path]
+        self.size -= size
+        return tree
+
+    def _evict(self) -> None:
+        tree_key, paths, _, roots = self._drop(next(iter(self._trees)))
+        for root in roots:
+            if isinstance(root, CollectedTree):
+                self._evicted[tree_key, root["path"]] = root
+        self.stats.evictions += 1
+        logger.debug(f"Evicted {len(paths)} collected objects from memory")
@@ -0,0 +1,404 @@
+"""This module implements the worker running in the subprocess opened by the handler.
+
+It wraps the command line application of `pytkdocs`, reading one JSON request per line on standard input,
+and writing one JSON response per line on standard output, see [`process`][mkdocstrings_handlers.python.process]
+for the format of the lines. The standard output file descriptor is reserved for responses: anything else
+written to it, for example by compiled extensions, goes to the standard error instead.
+On top of the collection requests understood by [`pytkdocs.cli.process_config`][],
+it supports the following requests:
+
+- `{"resolve": ["identifier", ...]}`: only resolve identifiers to their canonical path and module file path,
+    without collecting documentation. The response also contains the files of the modules each identifier
+    goes through, in `module_files`, and when import times are measured (see below),
+    the modules imported while resolving each identifier, in `import_times`.
+
+The responses to collection requests also contain the time it took to collect each object, in `durations`,
+the resident set size of the worker after collecting each object (on Linux only, `None` elsewhere), in `rss`,
+and the files of the modules each identifier goes through (see [`module_files`][mkdocstrings_handlers.python.worker.module_files]),
+in `module_files`.
+Each response identifier is followed by the peak resident set size of the worker, when it is available.
+
+When the `MKDOCSTRINGS_PYTHON_LEGACY_PROFILE_DIR` environment variable is set, the collection of each object
+is profiled with [`cProfile`][], and its statistics are written in this directory
+(see [`profiled`][mkdocstrings_handlers.python.worker.profiled]).
+
+When the `MKDOCSTRINGS_PYTHON_LEGACY_IMPORT_TIMES` environment variable is set, the time spent importing
+each module is measured (see [`ImportTimer`][mkdocstrings_handlers.python.worker.ImportTimer]),
+and the responses to collection requests contain the modules imported while collecting each object,
+with their import time in seconds (excluding the time spent importing their own imports), in `import_times`.
+
+This module is run as a script: it must not import the handler or anything that would not be needed
+to collect documentation.
+"""
+
+import cProfile
+import importlib.abc
+import importlib.machinery
+import json
+import os
+import re
+import sys
+import time
+import traceback
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from functools import wraps
+from itertools import count
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Optional
+
+from pytkdocs.cli import discarded_stdout, process_config
+from pytkdocs.loader import get_object_tree
+
+RESPONSE_MARKER = "\x1emkdpl:"
+"""The marker preceding each response, see [`process`][mkdocstrings_handlers.python.process].
+
+It starts with a control character, which is always escaped in JSON texts.
+"""
+
+PROFILE_DIR_ENV = "MKDOCSTRINGS_PYTHON_LEGACY_PROFILE_DIR"
+"""The environment variable enabling profiling, set to the directory in which profiles are written."""
+
+IMPORT_TIMES_ENV = "MKDOCSTRINGS_PYTHON_LEGACY_IMPORT_TIMES"
+"""The environment variable enabling the measure of import times."""
+
+_profile_ids = count()
+
+
+class SegmentProfiler:
+    """Profile segments of code with [`cProfile`][], and write their merged statistics once.
+
+    Coroutines and generators cannot be profiled as a whole: the profile would include the code
+    running while they are suspended. Instead, each segment of code between their `await` or `yield`
+    expressions is profiled, and the statistics of all the segments are written in a single file,
+    named `<phase>-<identifier>-<pid>-<n>.prof`. Nested or concurrent profiling is not supported:
+    when another profiler is already active, segments run without being profiled.
+    """
+
+    def __init__(self, directory: Optional[Path], phase: str, identifier: str) -> None:
+        """Initialize the profiler.
+
+        Arguments:
+            directory: The directory in which to write the statistics, or `None` to disable profiling.
+            phase: The profiled phase, for example `worker.collect`.
+            identifier: The identifier of the object being processed.
+        """
+        self.directory = directory
+        self.phase = phase
+        self.identifier = identifier
+        self._profiler = cProfile.Profile() if directory is not None else None
+        self._profiled = False
+
+    @contextmanager
+    def segment(self) -> Iterator[None]:
+        """Profile a segment of code, if profiling is enabled.
+
+        Yields:
+            Nothing.
+        """
+        if self._profiler is None:
+            yield
+            return
+        try:
+            self._profiler.enable()
+        except ValueError:
+            yield
+            return
+        self._profiled = True
+        try:
+            yield
+        finally:
+            self._profiler.disable()
+
+    def dump(self) -> None:
+        """Write the statistics of the profiled segments, if any."""
+        if self._profiler is None or self.directory is None or not self._profiled:
+            return
+        name = re.sub(r"[^\w.-]", "_", self.identifier)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._profiler.dump_stats(self.directory / f"{self.phase}-{name}-{os.getpid()}-{next(_profile_ids)}.prof")
+
+
+@contextmanager
+def profiled(directory: Optional[Path], phase: str, identifier: str) -> Iterator[None]:
+    """Profile a block of code with [`cProfile`][], if a directory is given.
+
+    The statistics are written to `<phase>-<identifier>-<pid>-<n>.prof` in the directory.
+    Profiles can be merged and inspected with [`pstats`][], or with the `profile-stats` command.
+    Nested or concurrent profiling is not supported: when another profiler is already active,
+    the block runs without being profiled. To profile coroutines and generators,
+    see [`SegmentProfiler`][mkdocstrings_handlers.python.worker.SegmentProfiler].
+
+    Arguments:
+        directory: The directory in which to write the statistics, or `None` to disable profiling.
+        phase: The profiled phase, for example `worker.collect`.
+        identifier: The identifier of the object being processed.
+
+    Yields:
+        Nothing.
+    """
+    profiler = SegmentProfiler(directory, phase, identifier)
+    try:
+        with profiler.segment():
+            yield
+    finally:
+        profiler.dump()
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """A meta path finder measuring the time it takes to execute each imported module.
+
+    It finds nothing itself: it delegates to the following finders, and wraps the `exec_module` method
+    of the loaders they return, like `python -X importtime` does. Each loader is wrapped once,
+    even when it is shared by several modules (for example a `zipimporter`). The time spent executing a module
+    excludes the time spent importing the modules it imports.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the timer."""
+        self.times: dict[str, float] = {}
+        """The import time of each module imported since the last reset, in seconds."""
+        self._stack: list[float] = []
+
+    def find_spec(
+        self,
+        fullname: str,
+        path: Optional[Sequence[str]],
+        target: Optional[ModuleType] = None,
+    ) -> Optional[importlib.machinery.ModuleSpec]:
+        """Find the spec of a module with the following finders, and time the execution of its loader.
+
+        Arguments:
+            fullname: The name of the module.
+            path: The search path of the parent package.
+            target: The module being reloaded, if any.
+
+        Returns:
+            The spec of the module, or `None`.
+        """
+        finders = sys.meta_path[sys.meta_path.index(self) + 1 :] if self in sys.meta_path else []
+        for finder in finders:
+            find_spec = getattr(finder, "find_spec", None)
+            if find_spec is None or (spec := find_spec(fullname, path, target)) is None:
+                continue
+            loader = spec.loader
+            # Shared loaders (built-in and frozen modules) are classes: leave them alone.
+            if (
+                loader is not None
+                and not isinstance(loader, type)
+                and hasattr(loader, "exec_module")
+                and getattr(loader.exec_module, "import_timer", None) is not self
+            ):
+                loader.exec_module = self._timed(loader.exec_module)
+            return spec
+        return None
+
+    def _timed(self, exec_module: Callable[[ModuleType], None]) -> Callable[[ModuleType], None]:
+        @wraps(exec_module)
+        def timed_exec_module(module: ModuleType) -> None:
+            fullname = module.__name__
+            self._stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                elapsed = time.perf_counter() - start
+                nested = self._stack.pop()
+                self.times[fullname] = self.times.get(fullname, 0.0) + elapsed - nested
+                if self._stack:
+                    self._stack[-1] += elapsed
+
+        timed_exec_module.import_timer = self  # type: ignore[attr-defined]
+        return timed_exec_module
+
+    def reset(self) -> dict[str, float]:
+        """Return the import times measured since the last reset, and reset them.
+
+        Returns:
+            The import time of each module, in seconds.
+        """
+        times, self.times = self.times, {}
+        return times
+
+
+def _resolve(identifier: str) -> Optional[dict[str, Optional[str]]]:
+    try:
+        leaf = get_object_tree(identifier)
+    except Exception:  # noqa: BLE001
+        return None
+    try:
+        file_path: Optional[str] = leaf.file_path
+    except TypeError:
+        file_path = None
+    return {"path": leaf.dotted_path, "file_path": file_path}
+
+
+def resolve(identifiers: list[str], import_timer: Optional[ImportTimer] = None) -> dict[str, Any]:
+    """Resolve identifiers to their canonical path and module file path.
+
+    Arguments:
+        identifiers: The identifiers to resolve.
+        import_timer: The timer measuring import times, if enabled.
+
+    Returns:
+        The canonical path and module file path of each identifier, or `None` if it cannot be imported,
+            in `resolved`, the files of the modules each identifier goes through in `module_files`,
+            and the modules imported while resolving each identifier in `import_times`, if an import timer is given.
+    """
+    response: dict[str, Any] = {"resolved": {}, "module_files": {}}
+    if import_timer:
+        response["import_times"] = []
+    for identifier in identifiers:
+        response["resolved"][identifier] = _resolve(identifier)
+        response["module_files"][identifier] = module_files(identifier)
+        if import_timer:
+            response["import_times"].append(import_timer.reset())
+    return response
+
+
+def module_files(identifier: str) -> list[str]:
+    """Return the files of the imported modules an identifier goes through.
+
+    For example, `package.Class` goes through `package/__init__.py`, even when the class
+    is defined in (and re-exported from) another module: the files of the collected objects alone
+    do not tell where the identifier points to.
+
+    Arguments:
+        identifier: The identifier, already imported.
+
+    Returns:
+        The module file paths, from the top-level module down.
+    """
+    parts = identifier.replace(":", ".").split(".")
+    files = []
+    for end in range(1, len(parts) + 1):
+        if file_path := getattr(sys.modules.get(".".join(parts[:end])), "__file__", None):
+            files.append(file_path)
+    return files
+
+
+def collect(config: dict[str, Any], import_timer: Optional[ImportTimer] = None) -> dict[str, Any]:
+    """Collect documentation, timing each object.
+
+    Arguments:
+        config: The collection request, see [`pytkdocs.cli.process_config`][].
+        import_timer: The timer measuring import times, if enabled.
+
+    Returns:
+        The merged responses of `pytkdocs`, with the duration (in seconds) of each object in `durations`,
+            the resident set size (in bytes) of the worker after each object in `rss`,
+            the files of the modules each identifier goes through in `module_files`,
+            and the modules imported by each object in `import_times`, if an import timer is given.
+    """
+    response: dict[str, Any] = {
+        "loading_errors": [],
+        "parsing_errors": {},
+        "objects": [],
+        "durations": [],
+        "rss": [],
+        "module_files": [],
+    }
+    if import_timer:
+        response["import_times"] = []
+    profile_dir = Path(os.environ[PROFILE_DIR_ENV]) if os.environ.get(PROFILE_DIR_ENV) else None
+    for obj_config in config["objects"]:
+        # The object configuration is consumed by pytkdocs.
+        path = obj_config["path"]
+        start = time.perf_counter()
+        with profiled(profile_dir, "worker.collect", path):
+            result = process_config({**config, "objects": [obj_config]})
+        response["durations"].append(time.perf_counter() - start)
+        response["rss"].append(current_rss())
+        response["module_files"].append(module_files(path))
+        if import_timer:
+            response["import_times"].append(import_timer.reset())
+        response["loading_errors"].extend(result["loading_errors"])
+        response["parsing_errors"].update(result["parsing_errors"])
+        response["objects"].extend(result["objects"])
+    return response
+
+
+def process_request(request: dict[str, Any], import_timer: Optional[ImportTimer] = None) -> dict[str, Any]:
+    """Process a request.
+
+    Arguments:
+        request: The request, loaded from JSON.
+        import_timer: The timer measuring import times, if enabled.
+
+    Returns:
+        The response.
+    """
+    if "resolve" in request:
+        return resolve(request["resolve"], import_timer)
+    return collect(request, import_timer)
+
+
+def peak_rss() -> Optional[int]:
+    """Return the peak resident set size of this process.
+
+    Returns:
+        The peak resident set size in bytes, or `None` when it is not available on this platform.
+    """
+    try:
+        import resource  # noqa: PLC0415
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes.
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def current_rss() -> Optional[int]:
+    """Return the current resident set size of this process.
+
+    It is read from `/proc/self/statm`, so it is only available on Linux.
+    The peak resident set size is not used instead: it would not tell how much memory each object retains.
+
+    Returns:
+        The resident set size in bytes, or `None` when it is not available on this platform.
+    """
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def main() -> int:
+    """Process requests read on standard input, one per line, until it is closed.
+
+    Returns:
+        An exit code.
+    """
+    # Keep the standard output file descriptor for responses,
+    # and send what others write to it (for example compiled extensions) to the standard error.
+    sys.stdout.flush()
+    responses = os.fdopen(os.dup(1), "w", encoding="utf8")
+    os.dup2(2, 1)
+
+    import_timer = None
+    if os.environ.get(IMPORT_TIMES_ENV):
+        import_timer = ImportTimer()
+        sys.meta_path.insert(0, import_timer)
+    for line in sys.stdin:
+        request_id, _, request = line.partition(" ")
+        with discarded_stdout():
+            if import_timer:
+                # Only attribute the imports of this request, not the ones of the worker itself.
+                import_timer.reset()
+            try:
+                output = json.dumps(process_request(json.loads(request), import_timer))
+            except Exception as error:  # noqa: BLE001
+                # Don't fail on error. We must handle the next inputs.
+                output = json.dumps({"error": str(error), "traceback": traceback.format_exc()})
+        rss = peak_rss()
+        header = request_id if rss is None else f"{request_id}:{rss}"
+        responses.write(f"{RESPONSE_MARKER}{header} {output}\n")
+        responses.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,6 +15,8 @@ if TYPE_CHECKING:
 
     from mkdocstrings import MkdocstringsExtension, MkdocstringsPlugin
 
+    from mkdocstrings_handlers.python.handler import PythonHandler
+
 
 @pytest.fixture(name="mkdocs_conf")
 def fixture_mkdocs_conf(request: pytest.FixtureRequest, tmp_path: Path) -> Iterator[MkDocsConfig]:
@@ -28,7 +30,8 @@ def fixture_mkdocs_conf(request: pytest.FixtureRequest, tmp_path: Path) -> Itera
         MkDocs configuration object.
     """
     conf = MkDocsConfig()
-    while hasattr(request, "_parent_request") and hasattr(request._parent_request, "_parent_request"):
+    # The configuration is parametrized indirectly, through one of the fixtures requesting it.
+    while not hasattr(request, "param") and hasattr(request, "_parent_request"):
         request = request._parent_request
 
     conf_dict = {
@@ -68,6 +71,21 @@ def fixture_plugin(mkdocs_conf: MkDocsConfig) -> MkdocstringsPlugin:
     return plugin
 
 
+@pytest.fixture(name="handler")
+def fixture_handler(plugin: MkdocstringsPlugin) -> PythonHandler:
+    """Return the Python handler of a plugin instance, with its Jinja environment set up.
+
+    Parameters:
+        plugin: A configurated plugin instance (fixture).
+
+    Returns:
+        The Python handler instance, ready to render collected objects.
+    """
+    handler = plugin.handlers.get_handler("python")
+    handler._update_env(plugin.md, config=plugin.handlers._tool_config)  # type: ignore[attr-defined]
+    return handler  # type: ignore[return-value]
+
+
 @pytest.fixture(name="ext_markdown")
 def fixture_ext_markdown(plugin: MkdocstringsPlugin) -> MkdocstringsExtension:
     """Return a Markdown instance with MkdocstringsExtension.
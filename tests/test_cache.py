@@ -0,0 +1,81 @@
+"""Tests for the `cache` module."""
+
+import json
+import os
+import zipfile
+from pathlib import Path
+
+from mkdocstrings_handlers.python.cache import (
+    BUNDLE_VERSION,
+    content_hash,
+    import_bundle,
+    prune_cache,
+    read_cache,
+    write_cache,
+)
+from mkdocstrings_handlers.python.scheduling import CollectionCosts
+
+
+def test_discard_corrupted_entries(tmp_path: Path) -> None:
+    """Assert that corrupted entries are discarded.
+
+    Parameters:
+        tmp_path: A temporary directory (pytest fixture).
+    """
+    path = tmp_path / "entry"
+    write_cache(path, b"data")
+    assert read_cache(path) == b"data"
+    path.write_bytes(path.read_bytes()[:-1])
+    assert read_cache(path) is None
+    assert not path.exists()
+
+
+def test_merge_concurrent_updates(tmp_path: Path) -> None:
+    """Assert that builds sharing a cache directory do not lose each other's records.
+
+    Parameters:
+        tmp_path: A temporary directory (pytest fixture).
+    """
+    path = tmp_path / "costs.json"
+    first, second = CollectionCosts(path), CollectionCosts(path)
+    first.record("first", 1, 1)
+    second.record("second", 2, 2)
+    first.save()
+    second.save()
+    assert CollectionCosts(path).costs == {"first": (1, 1), "second": (2, 2)}
+
+
+def test_prune_least_recently_used_entries(tmp_path: Path) -> None:
+    """Assert that the least recently used entries are evicted first.
+
+    Parameters:
+        tmp_path: A temporary directory (pytest fixture).
+    """
+    for index, name in enumerate(("old", "used", "new")):
+        write_cache(tmp_path / name, b"x" * 100)
+        os.utime(tmp_path / name, (index, index))
+    assert read_cache(tmp_path / "used")
+    assert prune_cache(tmp_path, 300) == 1
+    assert not (tmp_path / "old").exists()
+    assert (tmp_path / "used").exists()
+
+
+def test_import_bundle_within_cache_dir(tmp_path: Path) -> None:
+    """Assert that bundle entries cannot be written outside of the cache directory.
+
+    Parameters:
+        tmp_path: A temporary directory (pytest fixture).
+    """
+    data = b"data"
+    digest = content_hash(data)
+    outside = tmp_path / "outside"
+    names = ["inside", str(outside), "../outside", "C:/outside", "sub/../../outside"]
+    bundle = tmp_path / "bundle.zip"
+    with zipfile.ZipFile(bundle, "w") as archive:
+        archive.writestr(f"blobs/{digest}", data)
+        manifest = {"version": BUNDLE_VERSION, "entries": dict.fromkeys(names, digest)}
+        archive.writestr("manifest.json", json.dumps(manifest))
+    cache_dir = tmp_path / "cache"
+    assert import_bundle(bundle, cache_dir, []) == 1
+    assert read_cache(cache_dir / "inside") == data
+    assert not outside.exists()
@@ -0,0 +1,146 @@
+"""Tests for the `cli` module."""
+
+from pathlib import Path
+
+import pytest
+from mkdocs.config import load_config
+
+from mkdocstrings_handlers.python import cli, get_handler
+
+_MARKDOWN = """
+# API
+
+::: mkdocstrings_handlers.python.cache
+
+```md
+::: not.collected
+```
+
+::: mkdocstrings_handlers.python.scheduling
+    options:
+      members: [schedule]
+"""
+
+
+def test_iter_autodoc_blocks() -> None:
+    """Assert that autodoc instructions are found, with their options."""
+    assert list(cli.iter_autodoc_blocks(_MARKDOWN)) == [
+        ("mkdocstrings_handlers.python.cache", {}),
+        ("mkdocstrings_handlers.python.scheduling", {"options": {"members": ["schedule"]}}),
+    ]
+
+
+def test_prewarm(tmp_path: Path) -> None:
+    """Assert that prewarmed objects are collected without subprocesses.
+
+    Parameters:
+        tmp_path: A temporary directory (pytest fixture).
+    """
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "index.md").write_text(_MARKDOWN)
+    config_file = tmp_path / "mkdocs.yml"
+    config_file.write_text(
+        "site_name: Test\nplugins:\n- mkdocstrings:\n    handlers:\n      python:\n        cache_dir: cache\n",
+    )
+    assert cli.main(["prewarm", "-f", str(config_file)]) == 0
+
+    mkdocs_config = load_config(str(config_file))
+    handler = get_handler({"cache_dir": "cache"}, mkdocs_config, theme="mkdocs")
+    handler.collect("mkdocstrings_handlers.python.cache", handler.get_options({}))
+    handler.collect("mkdocstrings_handlers.python.scheduling", handler.get_options({"members": ["schedule"]}))
+    assert handler.get_aliases("mkdocstrings_handlers.python.cache.read_cache")
+    assert handler.get_aliases("mkdocstrings_handlers.python.scheduling.schedule")
+    assert not handler.workers.workers
+    handler.teardown()
+
+
+def test_prewarm_failures(tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+    """Assert that objects that cannot be collected are reported.
+
+    Parameters:
+        tmp_path: A temporary directory (pytest fixture).
+        capsys: Pytest fixture to capture output.
+    """
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "index.md").write_text("::: mkdocstrings_handlers.python.cache\n\n::: not_a_module\n")
+    config_file = tmp_path / "mkdocs.yml"
+    config_file.write_text(
+        "site_name: Test\nplugins:\n- mkdocstrings:\n    handlers:\n      python:\n        cache_dir: cache\n",
+    )
+    assert cli.main(["prewarm", "-f", str(config_file)]) == 1
+    output = capsys.readouterr()
+    assert "Could not collect not_a_module" in output.err
+    assert "Could not collect 1 of 2 objects" in output.err
+    assert "Collected" not in output.out
+
+
+def test_relocate_cache_bundle(tmp_path: Path) -> None:
+    """Assert that cache bundles can be imported in a project at another location.
+
+    Parameters:
+        tmp_path: A temporary directory (pytest fixture).
+    """
+    first, second = tmp_path / "first", tmp_path / "second"
+    for project in (first, second):
+        (project / "docs").mkdir(parents=True)
+        (project / "docs" / "index.md").write_text("::: package\n")
+        (project / "package.py").write_text('"""Docstring."""\n')
+        (project / "mkdocs.yml").write_text(
+            "site_name: Test\nplugins:\n- mkdocstrings:\n    handlers:\n      python:\n        cache_dir: cache\n",
+        )
+    bundle = str(tmp_path / "cache.zip")
+    assert cli.main(["prewarm", "-f", str(first / "mkdocs.yml")]) == 0
+    assert cli.main(["export-cache", bundle, "-f", str(first / "mkdocs.yml")]) == 0
+    assert cli.main(["import-cache", bundle, "-f", str(second / "mkdocs.yml")]) == 0
+
+    handler = get_handler({"cache_dir": "cache"}, load_config(str(second / "mkdocs.yml")), theme="mkdocs")
+    assert handler.collect("package", handler.get_options({}))["file_path"] == str(second / "package.py")
+    assert not handler.workers.workers
+    handler.teardown()
+
+
+def test_profile_stats(tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+    """Assert that the handler and its worker write profiles, which are merged by the `profile-stats` command.
+
+    Parameters:
+        tmp_path: A temporary directory (pytest fixture).
+        capsys: Pytest fixture to capture output.
+    """
+    (tmp_path / "docs").mkdir()
+    config_file = tmp_path / "mkdocs.yml"
+    config_file.write_text("site_name: Test\nplugins:\n- mkdocstrings\n")
+    handler = get_handler({"profile_dir": "profiles"}, load_config(str(config_file)), theme="mkdocs")
+    handler.collect("mkdocstrings_handlers.python.cache", handler.get_options({}))
+    handler.teardown()
+    phases = {path.name.split("-")[0] for path in (tmp_path / "profiles").iterdir()}
+    assert phases == {"handler.collect", "worker.collect"}
+
+    capsys.readouterr()
+    assert cli.main(["profile-stats", str(tmp_path / "profiles"), "--phase", "worker.collect"]) == 0
+    assert "worker.collect    mkdocstrings_handlers.python.cache" in capsys.readouterr().out
+
+
+def test_split_pages(tmp_path: Path) -> None:
+    """Assert that a module is split into one page per class, summarized in an index page.
+
+    Parameters:
+        tmp_path: A temporary directory (pytest fixture).
+    """
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "package.py").write_text(
+        '"""Docstring."""\n\n\nclass First:\n    """First class.\n\n    More details.\n    """\n\n\n'
+        'class Second:\n    """Second class."""\n\n\nclass second:\n    """Lower case class."""\n\n\n'
+        'class index:\n    """Index class."""\n',
+    )
+    config_file = tmp_path / "mkdocs.yml"
+    config_file.write_text("site_name: Test\nplugins:\n- mkdocstrings\n")
+    output_dir = tmp_path / "docs" / "package"
+    assert cli.main(["split-pages", "package", "-o", str(output_dir), "-f", str(config_file)]) == 0
+    pages = ["First.md", "Second.md", "index-2.md", "index.md", "second-2.md"]
+    assert sorted(path.name for path in output_dir.iterdir()) == pages
+    assert (output_dir / "First.md").read_text().startswith("::: package.First\n")
+    assert (output_dir / "second-2.md").read_text().startswith("::: package.second\n")
+    assert (output_dir / "index-2.md").read_text().startswith("::: package.index\n")
+    index = (output_dir / "index.md").read_text()
+    assert index.startswith("::: package\n")
+    assert "summary: true" in index
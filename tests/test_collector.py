@@ -1,11 +1,18 @@
 """Tests for the `collector` module."""
 
+import asyncio
+import sys
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from unittest import mock
 
 import pytest
 from mkdocstrings import CollectionError
 
 from mkdocstrings_handlers.python import get_handler
+from mkdocstrings_handlers.python import handler as handler_module
+from mkdocstrings_handlers.python.worker import ImportTimer, current_rss
 
 
 class _FakeMkDocsConfig:
@@ -33,3 +40,210 @@ def test_collect_result_error(retval: dict, exp_res: str) -> None:
             handler = get_handler({}, _FakeMkDocsConfig, theme="material")  # type: ignore[arg-type]
             assert handler.collect("", {})
             assert str(excinfo.value) == exp_res
+
+
+def test_collect_reuses_previously_collected_objects() -> None:
+    """Assert that objects already collected as part of a parent tree are reused."""
+    handler = get_handler({}, _FakeMkDocsConfig, theme="material")  # type: ignore[arg-type]
+    options = handler.get_options({})
+    module = handler.collect("mkdocstrings_handlers.python.rendering", options)
+    function = next(child for child in module["children"] if child["name"] == "iter_tree")
+    assert handler.collect("mkdocstrings_handlers.python.rendering.iter_tree", options) is function
+    assert (
+        handler.collect("mkdocstrings_handlers.python.rendering.iter_tree", {**options, "filters": []}) is not function
+    )
+    handler.teardown()
+
+
+@pytest.mark.parametrize(
+    "local_options",
+    [
+        {},
+        {"filters": ["!^_", "^__init__$"]},
+        {"members": ["iter_tree", "sort_object"]},
+        {"members": False},
+    ],
+)
+def test_collect_filter_locally(local_options: dict) -> None:
+    """Assert that filtering members in the handler gives the same objects as in `pytkdocs`.
+
+    Args:
+        local_options: The options of the autodoc instruction.
+    """
+    handler = get_handler({}, _FakeMkDocsConfig, theme="material")  # type: ignore[arg-type]
+    local_handler = get_handler({"filter_locally": True}, _FakeMkDocsConfig, theme="material")  # type: ignore[arg-type]
+    options = handler.get_options(local_options)
+    expected = handler.collect("mkdocstrings_handlers.python.handler", options)
+    assert local_handler.collect("mkdocstrings_handlers.python.handler", options) == expected
+    handler.teardown()
+    local_handler.teardown()
+
+
+def test_resolve_identifiers() -> None:
+    """Assert that identifiers are resolved without being collected."""
+    handler = get_handler({}, _FakeMkDocsConfig, theme="material")  # type: ignore[arg-type]
+    resolved = handler.resolve(["mkdocstrings_handlers.python.handler:PythonHandler", "not_a_module.not_an_object"])
+    assert resolved["mkdocstrings_handlers.python.handler:PythonHandler"] == {
+        "path": "mkdocstrings_handlers.python.handler.PythonHandler",
+        "file_path": str(Path(handler_module.__file__).resolve()),
+    }
+    assert resolved["not_a_module.not_an_object"] is None
+    assert handler.get_aliases("mkdocstrings_handlers.python.get_handler") == (
+        "mkdocstrings_handlers.python.handler.get_handler",
+    )
+    assert handler.get_aliases("not_a_module") == ()
+    handler.teardown()
+
+
+def test_default_search_path(tmp_path: Path) -> None:
+    """Assert that the directory of the configuration file is the default search path, as a string.
+
+    Parameters:
+        tmp_path: A temporary directory (pytest fixture).
+    """
+    mkdocs_config = mock.Mock(config_file_path=str(tmp_path / "mkdocs.yml"))
+    handler = get_handler({}, mkdocs_config, theme="material")
+    assert handler._paths == [str(tmp_path)]
+    handler.teardown()
+
+
+def test_concurrent_collection() -> None:
+    """Assert that objects can be collected from multiple threads."""
+    handler = get_handler({"max_workers": 2}, _FakeMkDocsConfig, theme="material")  # type: ignore[arg-type]
+    options = handler.get_options({})
+    modules = [f"mkdocstrings_handlers.python.{name}" for name in ("cache", "handler", "process", "rendering")]
+    with ThreadPoolExecutor(4) as pool:
+        collected = list(pool.map(lambda module: handler.collect(module, options), modules))
+    assert [obj["path"] for obj in collected] == modules
+    assert 1 <= len(handler.workers.workers) <= 2
+    handler.teardown()
+
+
+def test_asynchronous_collection() -> None:
+    """Assert that objects can be collected with the asynchronous API."""
+    handler = get_handler({"max_workers": 2}, _FakeMkDocsConfig, theme="material")  # type: ignore[arg-type]
+    options = handler.get_options({})
+    modules = [f"mkdocstrings_handlers.python.{name}" for name in ("cache", "handler", "process", "rendering")]
+    collected = asyncio.run(handler.acollect_many(modules, options))
+    assert [obj["path"] for obj in collected] == modules
+    assert handler.collect(modules[0], options) is collected[0]
+    handler.teardown()
+
+
+def test_import_times() -> None:
+    """Assert that import times are attributed to the identifier whose collection triggered the import."""
+    handler = get_handler({"import_times": True}, _FakeMkDocsConfig, theme="material")  # type: ignore[arg-type]
+    handler.collect("mkdocstrings_handlers.python.scheduling", handler.get_options({}))
+    import_times = {module: identifier for module, _, identifier in handler.import_times()}
+    assert import_times["mkdocstrings_handlers.python.scheduling"] == "mkdocstrings_handlers.python.scheduling"
+    assert import_times["mkdocstrings_handlers.python.cache"] == "mkdocstrings_handlers.python.scheduling"
+    handler.teardown()
+
+
+def test_import_times_of_resolved_identifiers() -> None:
+    """Assert that imports triggered by resolving identifiers are attributed to them."""
+    handler = get_handler({"import_times": True}, _FakeMkDocsConfig, theme="material")  # type: ignore[arg-type]
+    handler.resolve(["mkdocstrings_handlers.python.scheduling"])
+    import_times = {module: identifier for module, _, identifier in handler.import_times()}
+    assert import_times["mkdocstrings_handlers.python.scheduling"] == "mkdocstrings_handlers.python.scheduling"
+    handler.teardown()
+
+
+def test_import_timer_shared_loader(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Assert that loaders shared by several modules are only wrapped once.
+
+    Parameters:
+        tmp_path: A temporary directory (pytest fixture).
+        monkeypatch: A fixture to patch objects (pytest fixture).
+    """
+    archive = tmp_path / "modules.zip"
+    with zipfile.ZipFile(archive, "w") as zip_file:
+        zip_file.writestr("zipped_first.py", "")
+        zip_file.writestr("zipped_second.py", "")
+    import_timer = ImportTimer()
+    monkeypatch.syspath_prepend(str(archive))
+    monkeypatch.setattr(sys, "meta_path", [import_timer, *sys.meta_path])
+    monkeypatch.setattr(sys, "modules", dict(sys.modules))
+    import zipped_first  # noqa: PLC0415
+    import zipped_second  # noqa: PLC0415
+
+    loader = zipped_first.__spec__.loader
+    assert loader is zipped_second.__spec__.loader
+    assert not hasattr(loader.exec_module.__wrapped__, "__wrapped__")
+    assert set(import_timer.reset()) == {"zipped_first", "zipped_second"}
+
+
+def test_current_rss_unavailable() -> None:
+    """Assert that the current resident set size is not replaced by the peak one when it is not available."""
+    assert current_rss()
+    with mock.patch("builtins.open", side_effect=OSError):
+        assert current_rss() is None
+
+
+def test_invalidate_cached_packages(tmp_path: Path) -> None:
+    """Assert that cached objects are collected again when their package changes.
+
+    Parameters:
+        tmp_path: A temporary directory (pytest fixture).
+    """
+    package = tmp_path / "cached_package"
+    package.mkdir()
+    (package / "__init__.py").write_text('"""Package."""\n\nfrom cached_package.first import Class\n')
+    (package / "first.py").write_text('"""First."""\n\n\nclass Class:\n    """Class from first."""\n')
+    (package / "second.py").write_text('"""Second."""\n\n\nclass Class:\n    """Class from second."""\n')
+
+    def collect(identifier: str) -> dict:
+        config = {"paths": [str(tmp_path)], "cache_dir": str(tmp_path / "cache")}
+        handler = get_handler(config, _FakeMkDocsConfig, theme="material")  # type: ignore[arg-type]
+        try:
+            return handler.collect(identifier, handler.get_options({}))
+        finally:
+            handler.teardown()
+
+    assert [child["name"] for child in collect("cached_package")["children"]] == ["first", "second"]
+    assert collect("cached_package.Class")["docstring"] == "Class from first."
+
+    (package / "third.py").write_text('"""Third."""\n')
+    assert [child["name"] for child in collect("cached_package")["children"]] == ["first", "second", "third"]
+
+    (package / "__init__.py").write_text('"""Package."""\n\nfrom cached_package.second import Class\n')
+    assert collect("cached_package.Class")["docstring"] == "Class from second."
+
+
+def test_invalidate_resolved_reexports(tmp_path: Path) -> None:
+    """Assert that cached aliases are resolved again when the module re-exporting them changes.
+
+    Parameters:
+        tmp_path: A temporary directory (pytest fixture).
+    """
+    package = tmp_path / "resolved_package"
+    package.mkdir()
+    (package / "__init__.py").write_text("from resolved_package.first import Class\n")
+    (package / "first.py").write_text("class Class: ...\n")
+    (package / "second.py").write_text("class Class: ...\n")
+
+    def get_aliases(identifier: str) -> tuple[str, ...]:
+        config = {"paths": [str(tmp_path)], "cache_dir": str(tmp_path / "cache")}
+        handler = get_handler(config, _FakeMkDocsConfig, theme="material")  # type: ignore[arg-type]
+        try:
+            return handler.get_aliases(identifier)
+        finally:
+            handler.teardown()
+
+    assert get_aliases("resolved_package.Class") == ("resolved_package.first.Class",)
+    (package / "__init__.py").write_text("from resolved_package.second import Class\n")
+    assert get_aliases("resolved_package.Class") == ("resolved_package.second.Class",)
+
+
+def test_teardown_closes_store(tmp_path: Path) -> None:
+    """Assert that the store of collected objects is closed on teardown.
+
+    Parameters:
+        tmp_path: A temporary directory (pytest fixture).
+    """
+    handler = get_handler({"cache_dir": str(tmp_path)}, _FakeMkDocsConfig, theme="material")  # type: ignore[arg-type]
+    handler.collect("mkdocstrings_handlers.python.scheduling", handler.get_options({}))
+    handler.teardown()
+    store = handler._collection_cache
+    assert store._map is None
+    assert store._file is None
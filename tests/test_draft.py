@@ -0,0 +1,32 @@
+"""Tests for the draft mode."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    from mkdocstrings_handlers.python.handler import PythonHandler
+
+
+@pytest.mark.parametrize(
+    "plugin",
+    [{"plugins": [{"mkdocstrings": {"handlers": {"python": {"draft": True}}}}]}],
+    indirect=["plugin"],
+)
+def test_draft_mode(handler: PythonHandler) -> None:
+    """Assert that source code, cross-references and highlighted headings are not rendered in draft mode.
+
+    Parameters:
+        handler: The Python handler of the plugin instance (fixture, with a parametrized plugin).
+    """
+    options = handler.get_options({"show_source": True})
+    assert not options["show_source"]
+    data = handler.collect("mkdocstrings_handlers.python.handler", options)
+    html = handler.render(data, options)
+    assert ">BaseHandler</span>)" in html
+    assert "optional hover" not in html
+    assert "Source code in" not in html
+    # Headings are not highlighted.
+    assert '<code class="highlight language-python">get_handler(handler_config, tool_config, **kwargs)</code>' in html
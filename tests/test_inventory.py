@@ -0,0 +1,96 @@
+"""Tests for the `inventory` module."""
+
+from __future__ import annotations
+
+from io import BytesIO
+from typing import TYPE_CHECKING
+from unittest import mock
+
+from mkdocs.utils.cache import download_and_cache_url
+from mkdocstrings import Inventory
+
+from mkdocstrings_handlers.python import inventory
+from mkdocstrings_handlers.python.inventory import (
+    INVENTORY_CACHE_DURATION,
+    InventoryPrefetcher,
+    iter_sphinx_inventory,
+    load_inventory,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+
+def _sphinx_inventory() -> bytes:
+    inv = Inventory()
+    for index in range(1000):
+        inv.register(f"package.module{index}", "py", "module", f"module{index}.html#$")
+        inv.register(f"label{index}", "std", "label", f"labels.html#label{index}", dispname="Label")
+    return inv.format_sphinx()
+
+
+def test_iter_sphinx_inventory() -> None:
+    """Assert that streamed inventory items are the same as the parsed ones."""
+    data = _sphinx_inventory()
+    with mock.patch.object(inventory, "CHUNK_SIZE", 128):
+        items = list(iter_sphinx_inventory(BytesIO(data), domain_filter=("py",)))
+    expected = Inventory.parse_sphinx(BytesIO(data), domain_filter=("py",))
+    assert [item.name for item in items] == list(expected)
+    assert [item.uri for item in items] == [item.uri for item in expected.values()]
+
+
+def test_load_inventory_from_cache(tmp_path: Path) -> None:
+    """Assert that parsed inventories are cached and reused.
+
+    Parameters:
+        tmp_path: Pytest temporary path fixture.
+    """
+    data = _sphinx_inventory()
+    url = "https://example.org/objects.inv"
+    items = list(load_inventory(BytesIO(data), url, cache_dir=tmp_path))
+    assert len(items) == 1000
+    assert items[0] == ("package.module0", "https://example.org/module0.html#package.module0")
+    assert len(list(tmp_path.iterdir())) == 1
+
+    with mock.patch.object(inventory, "iter_sphinx_inventory") as parse:
+        assert list(load_inventory(BytesIO(data), url, cache_dir=tmp_path)) == items
+        parse.assert_not_called()
+
+    assert list(load_inventory(BytesIO(data), url, base_url="https://example.com", cache_dir=tmp_path)) != items
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_prefetch_inventories(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Assert that cached copies of inventory files are parsed ahead of their loading.
+
+    Parameters:
+        tmp_path: Pytest temporary path fixture.
+        monkeypatch: Pytest monkeypatch fixture.
+    """
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    data = _sphinx_inventory()
+    url = "https://example.org/objects.inv"
+    missing = "https://example.org/missing/objects.inv"
+    download_and_cache_url(url, INVENTORY_CACHE_DURATION, download=lambda _: data)
+    expected = list(load_inventory(BytesIO(data), url))
+
+    prefetcher = InventoryPrefetcher(max_workers=1)
+    try:
+        prefetcher.prefetch(url)
+        prefetcher.prefetch(missing)
+        with mock.patch.object(inventory, "iter_sphinx_inventory") as parse:
+            assert list(prefetcher.load(BytesIO(data), url)) == expected
+            parse.assert_not_called()
+
+        # Inventories that were not cached yet, or whose contents changed, are parsed when loaded.
+        assert list(prefetcher.load(BytesIO(data), missing)) == list(load_inventory(BytesIO(data), missing))
+        prefetcher.prefetch(url)
+        other = Inventory()
+        other.register("other", "py", "module", "other.html")
+        assert list(prefetcher.load(BytesIO(other.format_sphinx()), url)) == [
+            ("other", "https://example.org/other.html"),
+        ]
+    finally:
+        prefetcher.close()
@@ -0,0 +1,41 @@
+"""Tests for the memory report."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    from mkdocstrings_handlers.python.handler import PythonHandler
+
+
+@pytest.mark.parametrize(
+    "plugin",
+    [{"plugins": [{"mkdocstrings": {"handlers": {"python": {"memory_report": True}}}}]}],
+    indirect=["plugin"],
+)
+def test_memory_report(handler: PythonHandler) -> None:
+    """Assert that the memory allocated by each phase is reported per identifier.
+
+    Parameters:
+        handler: The Python handler of the plugin instance (fixture, with a parametrized plugin).
+    """
+    options = handler.get_options({})
+    data = handler.collect("mkdocstrings_handlers.python.memory", options)
+    handler.render(data, options)
+    report = handler._memory
+    assert report is not None
+    assert set(report.phases["mkdocstrings_handlers.python.memory"]) == {"decode", "rebuild", "sort", "render"}
+    assert "mkdocstrings_handlers.python.memory" in report.format()
+
+    # Batched responses are only measured per object once decoded.
+    modules = ["mkdocstrings_handlers.python.cache", "mkdocstrings_handlers.python.scheduling"]
+    for module in modules:
+        handler._costs.record(module, 0.001, 1000)
+    asyncio.run(handler.acollect_many(modules, options))
+    for module in modules:
+        assert set(report.phases[module]) == {"rebuild"}
+    assert not any("," in identifier for identifier in report.phases)
+    handler.teardown()
@@ -0,0 +1,94 @@
+"""Tests for the `process` module."""
+
+from __future__ import annotations
+
+import sys
+
+import pytest
+from mkdocstrings import CollectionError
+
+from mkdocstrings_handlers.python.process import WorkerPool, WorkerProcess
+from mkdocstrings_handlers.python.worker import RESPONSE_MARKER
+
+# Read two requests, print garbage, answer them in reverse order, then exit without answering the third one.
+_SCRIPT = f"""
+import sys
+MARKER = {RESPONSE_MARKER!r}
+first, second = sys.stdin.readline(), sys.stdin.readline()
+print("garbage", flush=True)
+print("1 not a response", flush=True)
+print("partial line: ", end="")
+for line in (second, first):
+    request_id, _, request = line.partition(" ")
+    print(f"{{MARKER}}{{request_id}}", request.strip().upper(), flush=True)
+sys.stdin.readline()
+"""
+
+# Answer each request with its process identifier, reporting a resident set size of 1000 bytes.
+_ECHO_SCRIPT = f"""
+import os, sys
+MARKER = {RESPONSE_MARKER!r}
+for line in sys.stdin:
+    request_id, _, request = line.partition(" ")
+    print(f"{{MARKER}}{{request_id}}:1000", os.getpid(), flush=True)
+"""
+
+# Answer the first request with a mangled identifier, and the second one normally.
+_MANGLED_SCRIPT = f"""
+import sys
+MARKER = {RESPONSE_MARKER!r}
+first, second = sys.stdin.readline(), sys.stdin.readline()
+print(f"{{MARKER}}garbage{{first.partition(' ')[0]}} mangled", flush=True)
+print(f"{{MARKER}}{{second.partition(' ')[0]}} second", flush=True)
+sys.stdin.readline()
+"""
+
+
+def test_out_of_order_responses() -> None:
+    """Assert that responses are matched to their requests, and that unexpected output is ignored."""
+    worker = WorkerProcess([sys.executable, "-c", _SCRIPT])
+    first = worker.submit('"first"')
+    second = worker.submit('"second"')
+    assert second.result(timeout=10) == '"SECOND"\n'
+    assert first.result(timeout=10) == '"FIRST"\n'
+    third = worker.submit('"third"')
+    with pytest.raises(CollectionError):
+        third.result(timeout=10)
+    with pytest.raises(CollectionError):
+        worker.submit('"fourth"')
+    worker.close()
+
+
+def test_fail_oldest_request_on_mangled_response() -> None:
+    """Assert that a response whose identifier cannot be read fails the oldest pending request."""
+    worker = WorkerProcess([sys.executable, "-c", _MANGLED_SCRIPT])
+    first = worker.submit('"first"')
+    second = worker.submit('"second"')
+    with pytest.raises(CollectionError, match="Unreadable response"):
+        first.result(timeout=10)
+    assert second.result(timeout=10) == "second\n"
+    worker.close()
+
+
+def test_requests_cannot_be_cancelled() -> None:
+    """Assert that sent requests cannot be cancelled, so that their responses can always be set."""
+    worker = WorkerProcess([sys.executable, "-c", _ECHO_SCRIPT])
+    future = worker.submit('"request"')
+    assert not future.cancel()
+    assert future.result(timeout=10)
+    worker.close()
+
+
+@pytest.mark.parametrize(("max_requests", "max_rss", "processes"), [(0, 0, 1), (2, 0, 2), (0, 999, 4)])
+def test_recycle_workers(max_requests: int, max_rss: int, processes: int) -> None:
+    """Assert that workers are recycled when they reach their limits.
+
+    Parameters:
+        max_requests: The number of requests after which workers are recycled.
+        max_rss: The resident set size after which workers are recycled.
+        processes: The expected number of processes.
+    """
+    pool = WorkerPool([sys.executable, "-c", _ECHO_SCRIPT], max_requests=max_requests, max_rss=max_rss)
+    pids = {pool.request('"request"') for _ in range(4)}
+    assert len(pids) == processes
+    pool.close()
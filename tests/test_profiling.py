@@ -0,0 +1,32 @@
+"""Tests for the profiling of collections and renderings."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from mkdocstrings_handlers.python.handler import PythonHandler
+
+
+def test_profile_asynchronous_collection(handler: PythonHandler, tmp_path: Path) -> None:
+    """Assert that asynchronous collections and streamed renderings are profiled per object.
+
+    Parameters:
+        handler: The Python handler of the plugin instance (fixture).
+        tmp_path: Pytest temporary path fixture.
+    """
+    handler._profile_dir = tmp_path
+    options = handler.get_options({})
+    modules = ["mkdocstrings_handlers.python.cache", "mkdocstrings_handlers.python.scheduling"]
+    collected = asyncio.run(handler.acollect_many(modules, options))
+    asyncio.run(handler.acollect(modules[0], options))
+    "".join(handler.render_stream(collected[1], options))
+    assert sorted(path.name.rsplit("-", 2)[0] for path in tmp_path.iterdir()) == [
+        f"handler.collect-{modules[0]}",
+        f"handler.collect-{modules[0]}",
+        f"handler.collect-{modules[1]}",
+        f"handler.render-{modules[1]}",
+    ]
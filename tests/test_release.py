@@ -0,0 +1,63 @@
+"""Tests for the release of rendered objects."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    from mkdocstrings_handlers.python.handler import PythonHandler
+
+
+@pytest.mark.parametrize(
+    "plugin",
+    [
+        {"plugins": [{"mkdocstrings": {"handlers": {"python": {"release_rendered": True}}}}]},
+        {"plugins": [{"mkdocstrings": {"handlers": {"python": {"release_rendered": True, "filter_locally": True}}}}]},
+    ],
+    indirect=["plugin"],
+)
+def test_release_rendered_objects(handler: PythonHandler) -> None:
+    """Assert that rendered objects are released, and collected again when needed.
+
+    Parameters:
+        handler: The Python handler of the plugin instance (fixture, with a parametrized plugin).
+    """
+    options = handler.get_options({"show_source": True})
+    data = handler.collect("mkdocstrings_handlers.python.rendering", options)
+    # With `filter_locally`, the collected data is a view of the indexed tree.
+    indexed = handler._lookup("mkdocstrings_handlers.python.rendering", handler._selection(options))
+    html = handler.render(data, options)
+    for obj in (data, indexed):
+        assert obj is not None
+        assert not obj["source"]
+        assert not obj["docstring"]
+        assert not obj["children"][0]["source"]
+    data = handler.collect("mkdocstrings_handlers.python.rendering", options)
+    assert data["source"]
+    assert handler.render(data, options) == html
+
+
+@pytest.mark.parametrize(
+    "plugin",
+    [{"plugins": [{"mkdocstrings": {"handlers": {"python": {"release_rendered": True}}}}]}],
+    indirect=["plugin"],
+)
+def test_release_rendered_objects_in_use(handler: PythonHandler) -> None:
+    """Assert that objects still being rendered elsewhere are not released.
+
+    Parameters:
+        handler: The Python handler of the plugin instance (fixture, with a parametrized plugin).
+    """
+    options = handler.get_options({"show_source": True})
+    module = "mkdocstrings_handlers.python.rendering"
+    html = handler.render(handler.collect(module, options), options)
+    data = handler.collect(module, options)
+    stream = handler.render_stream(data, options)
+    chunks = [next(stream)]
+    # The same objects are rendered again (in another thread for example) before the first rendering ends.
+    assert handler.collect(module, options)["children"][0] is data["children"][0]
+    handler.render(data, options)
+    assert "".join([*chunks, *stream]) == html
+    assert not data["children"][0]["source"]
@@ -3,14 +3,26 @@
 from __future__ import annotations
 
 from copy import deepcopy
+from typing import TYPE_CHECKING
+
+import pytest
 
 from mkdocstrings_handlers.python.rendering import (
+    compile_filters,
+    filter_tree,
     rebuild_category_lists,
     sort_key_alphabetical,
     sort_key_source,
     sort_object,
 )
 
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from mkdocstrings import MkdocstringsPlugin
+
+    from mkdocstrings_handlers.python.handler import PythonHandler
+
 
 def test_members_order() -> None:
     """Assert that members sorting functions work correctly."""
@@ -86,3 +98,94 @@ def test_members_order() -> None:
             {"name": "z", "source": {"line_start": 100}, **rebuilt_categories},
         ]
     )
+
+
+def test_filter_tree() -> None:
+    """Assert that members are selected like `pytkdocs` does."""
+    subcategories: dict[str, list] = {key: [] for key in ("attributes", "classes", "functions", "methods", "modules")}
+
+    def _function(name: str) -> dict:
+        return {"name": name, "category": "function", "children": [], **subcategories}
+
+    functions = [_function(name) for name in ("public", "_private", "__special__")]
+    module = {"name": "module", "children": functions, **subcategories, "functions": functions}
+
+    filtered = filter_tree(module, compile_filters(["!^_[^_]"]))
+    assert [child["name"] for child in filtered["children"]] == ["public", "__special__"]
+    assert filtered["functions"] == filtered["children"]
+    assert len(module["children"]) == 3
+
+    filtered = filter_tree(module, compile_filters(["!^_", "^__"]))
+    assert [child["name"] for child in filtered["functions"]] == ["public", "__special__"]
+
+    filtered = filter_tree(module, compile_filters(["!^_[^_]"]), members=["_private"])
+    assert [child["name"] for child in filtered["functions"]] == ["_private"]
+
+    assert filter_tree(module, compile_filters([]), members=False)["children"] == []
+
+
+@pytest.mark.parametrize(
+    "plugin",
+    [{"plugins": [{"mkdocstrings": {"handlers": {"python": {"render_workers": 2}}}}]}],
+    indirect=["plugin"],
+)
+def test_render_with_workers(handler: PythonHandler) -> None:
+    """Assert that highlighting source code in a pool of processes gives the same HTML.
+
+    Parameters:
+        handler: The Python handler of the plugin instance (fixture, with a parametrized plugin).
+    """
+    options = handler.get_options({})
+    data = handler.collect("mkdocstrings_handlers.python.rendering", options)
+    highlight = handler.env.filters["highlight"]
+    stream = handler.render_stream(data, options)
+    chunks = [next(stream)]
+    # The environment is shared by concurrent renderings: it must not change while rendering.
+    assert handler.env.filters["highlight"] is highlight
+    html = "".join([*chunks, *stream])
+    assert handler._render_pool is not None
+    handler._render_workers = 0
+    assert handler.render(data, options) == html
+
+
+def test_render_stream(handler: PythonHandler) -> None:
+    """Assert that the streamed HTML is the same as the rendered one.
+
+    Parameters:
+        handler: The Python handler of the plugin instance (fixture).
+    """
+    options = handler.get_options({})
+    data = handler.collect("mkdocstrings_handlers.python.rendering", options)
+    chunks = list(handler.render_stream(data, options))
+    assert len(chunks) > 1
+    assert "".join(chunks) == handler.render(data, options)
+
+
+def test_templates_bytecode_cache(plugin: MkdocstringsPlugin, tmp_path: Path) -> None:
+    """Assert that compiled templates are cached in the configured cache directory.
+
+    Parameters:
+        plugin: The plugin instance (fixture).
+        tmp_path: Pytest temporary path fixture.
+    """
+    handler = plugin.handlers.get_handler("python")
+    # The cache directory must be set before the environment is set up.
+    handler._cache_dir = tmp_path  # type: ignore[attr-defined]
+    handler._update_env(plugin.md, config=plugin.handlers._tool_config)  # type: ignore[attr-defined]
+    options = handler.get_options({})
+    handler.render(handler.collect("mkdocstrings_handlers.python.rendering", options), options)
+    assert list((tmp_path / "templates").iterdir())
+
+
+def test_render_summary(handler: PythonHandler) -> None:
+    """Assert that the classes of the root object are only summarized with the `summary` option.
+
+    Parameters:
+        handler: The Python handler of the plugin instance (fixture).
+    """
+    options = handler.get_options({"summary": True})
+    html = handler.render(handler.collect("mkdocstrings_handlers.python.trees", options), options)
+    assert '<autoref identifier="mkdocstrings_handlers.python.trees.CollectedTrees" optional>' in html
+    assert "The collected object trees, indexed by object path" in html
+    assert "Look an object up" not in html
+    assert "Reduce the memory used by a collected object" in html
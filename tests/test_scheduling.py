@@ -0,0 +1,26 @@
+"""Tests for the `scheduling` module."""
+
+from pathlib import Path
+
+from mkdocstrings_handlers.python.scheduling import CollectionCosts, schedule
+
+
+def test_schedule_longest_first(tmp_path: Path) -> None:
+    """Assert that expensive objects are scheduled first, and cheap ones batched.
+
+    Parameters:
+        tmp_path: A temporary directory (pytest fixture).
+    """
+    costs = CollectionCosts(tmp_path / "costs.json")
+    costs.record("small1", 0.01, 100)
+    costs.record("medium", 1, 100)
+    costs.record("small2", 0.01, 100)
+    costs.record("large", 5, 100)
+    costs.save()
+    costs = CollectionCosts(tmp_path / "costs.json")
+    assert schedule(["small1", "medium", "small2", "unknown", "large"], costs) == [
+        ["unknown"],
+        ["large"],
+        ["medium"],
+        ["small1", "small2"],
+    ]
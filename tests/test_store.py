@@ -0,0 +1,79 @@
+"""Tests for the `store` module."""
+
+from pathlib import Path
+
+from mkdocstrings_handlers.python.store import CollectionCache
+
+
+def _module(tmp_path: Path) -> dict:
+    file_path = tmp_path / "module.py"
+    file_path.write_text("class Class:\n    def method(self): ...\n")
+    method = {"path": "module.Class.method", "file_path": str(file_path), "children": {}}
+    klass = {"path": "module.Class", "file_path": str(file_path), "children": {method["path"]: method}}
+    return {"path": "module", "file_path": str(file_path), "children": {klass["path"]: klass}}
+
+
+def test_lookup_subtrees(tmp_path: Path) -> None:
+    """Assert that objects can be found within previously stored trees, until their files change.
+
+    Parameters:
+        tmp_path: A temporary directory (pytest fixture).
+    """
+    cache = CollectionCache(tmp_path / "objects.store")
+    cache.set("options", "module", _module(tmp_path), [], {"module.Class": ["error"]})
+    cache.flush()
+    cache.close()
+
+    cache = CollectionCache(tmp_path / "objects.store")
+    response = cache.get("options", "module.Class", subtree=True)
+    assert response
+    assert response["parsing_errors"] == {"module.Class": ["error"]}
+    assert list(response["objects"][0]["children"]) == ["module.Class.method"]
+    assert cache.get("options", "module.Class") is None
+    assert cache.get("other options", "module.Class", subtree=True) is None
+    cache.close()
+
+    (tmp_path / "module.py").write_text("class Class: ...\n")
+    cache = CollectionCache(tmp_path / "objects.store")
+    assert cache.get("options", "module") is None
+    cache.close()
+
+
+def test_compact_least_recently_used_entries(tmp_path: Path) -> None:
+    """Assert that the least recently used entries are dropped to fit in the size budget.
+
+    Parameters:
+        tmp_path: A temporary directory (pytest fixture).
+    """
+    cache = CollectionCache(tmp_path / "objects.store")
+    for identifier in ("first", "second"):
+        cache.set("options", identifier, _module(tmp_path), [], {})
+        cache.flush()
+    assert cache.get("options", "first")
+    cache.flush(max_size=(tmp_path / "objects.store").stat().st_size // 2)
+    assert cache.get("options", "first")
+    assert cache.get("options", "second") is None
+    assert cache.stats.evictions == 1
+    cache.close()
+
+
+def test_record_last_use_without_appending(tmp_path: Path) -> None:
+    """Assert that reading entries does not append a new index to the store.
+
+    Parameters:
+        tmp_path: A temporary directory (pytest fixture).
+    """
+    cache = CollectionCache(tmp_path / "objects.store")
+    for identifier in ("first", "second"):
+        cache.set("options", identifier, _module(tmp_path), [], {})
+        cache.flush()
+    size = (tmp_path / "objects.store").stat().st_size
+    assert cache.get("options", "first")
+    cache.flush()
+    assert (tmp_path / "objects.store").stat().st_size == size
+    assert (tmp_path / "objects.used.store").exists()
+    cache.flush(max_size=size // 2)
+    assert cache.get("options", "first")
+    assert cache.get("options", "second") is None
+    assert not (tmp_path / "objects.used.store").exists()
+    cache.close()
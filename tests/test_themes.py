@@ -7,7 +7,7 @@ from typing import TYPE_CHECKING
 import pytest
 
 if TYPE_CHECKING:
-    from mkdocstrings import MkdocstringsPlugin
+    from mkdocstrings_handlers.python.handler import PythonHandler
 
 
 @pytest.mark.parametrize(
@@ -31,15 +31,13 @@ if TYPE_CHECKING:
         "mkdocstrings_handlers.python.rendering",
     ],
 )
-def test_render_themes_templates(module: str, plugin: MkdocstringsPlugin) -> None:
+def test_render_themes_templates(module: str, handler: PythonHandler) -> None:
     """Test rendering of a given theme's templates.
 
     Parameters:
         module: The module to load and render (parametrized).
-        plugin: The plugin instance (parametrized fixture).
+        handler: The Python handler of the plugin instance (fixture, with a parametrized plugin).
     """
-    handler = plugin.handlers.get_handler("python")
-    handler._update_env(plugin.md, config=plugin.handlers._tool_config)  # type: ignore[attr-defined]
     options = handler.get_options({})
     data = handler.collect(module, options)
     handler.render(data, options)
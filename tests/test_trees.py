@@ -0,0 +1,57 @@
+"""Tests for the `trees` module."""
+
+import copy
+
+from mkdocstrings_handlers.python.trees import CollectedTree, CollectedTrees, SourceSlice, compact_tree
+
+
+def _tree(path: str) -> dict:
+    return {"path": path, "children": [{"path": f"{path}.child", "children": []}]}
+
+
+def test_evict_least_recently_used_trees() -> None:
+    """Assert that the least recently used trees are evicted first."""
+    trees = CollectedTrees(max_size=20)
+    trees.add("options", [_tree("a")], 10)
+    trees.add("options", [_tree("b")], 10)
+    assert trees.get("options", "a.child")
+    trees.add("options", [_tree("c")], 10)
+    assert trees.get("options", "a")
+    assert trees.get("options", "b.child") is None
+    assert trees.get("options", "c")
+    assert (trees.stats.hits, trees.stats.misses, trees.stats.evictions) == (3, 1, 1)
+
+
+def test_revive_evicted_trees_in_use() -> None:
+    """Assert that evicted trees still referenced elsewhere can be looked up, until they are forgotten."""
+    trees = CollectedTrees(max_size=10)
+    in_use = CollectedTree(_tree("a"))
+    trees.add("options", [in_use], 10)
+    trees.add("options", [CollectedTree(_tree("b"))], 10)
+    assert trees.get("options", "a.child") is in_use["children"][0]
+    assert trees.get("options", "b") is None
+    trees.forget(["a.child"])
+    assert trees.get("options", "a") is None
+
+
+def test_compact_tree() -> None:
+    """Assert that compacted trees share their strings and source code, and stay equal to the original ones."""
+    method_code = "    def method(self):\n        pass\n"
+    class_code = f"class Class:\n{method_code}"
+    module_code = f"import os\n\n{class_code}"
+    method = {"path": "module.Class.method", "file_path": "".join(["module", ".py"]), "children": []}
+    method["source"] = {"code": method_code, "line_start": 4}
+    klass = {"path": "module.Class", "file_path": "module.py", "children": [method]}
+    klass["source"] = {"code": class_code, "line_start": 3}
+    module = {
+        "path": "module",
+        "file_path": "module.py",
+        "children": [klass],
+        "source": {"code": module_code, "line_start": 1},
+    }
+    expected = copy.deepcopy(module)
+    compact_tree(module)
+    assert module == expected
+    assert isinstance(method["source"], SourceSlice)
+    assert method["source"]["code"] == method_code
+    assert method["file_path"] is klass["file_path"]